@@ -255,8 +255,11 @@ async def main():
         # データマイルストーン通知
         await monitor.discord_system.send_data_milestone_notification(100, 100)
     
-    # 通常の監視開始
-    await monitor.monitor_all_routes()
+    # 通常の監視開始（終了時に共有HTTPセッションを閉じる）
+    try:
+        await monitor.monitor_all_routes()
+    finally:
+        await monitor.aclose()
 
 if __name__ == "__main__":
     import asyncio
@@ -7,11 +7,12 @@ Hokkaido Ferry Operation Forecast UI System
 7日間の各航路・各便の詳細運航予報を表示
 """
 
-import asyncio
+import functools
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
 from typing import Dict, List, Optional
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 
@@ -21,7 +22,7 @@ from prediction_data_integration import PredictionDataIntegration
 from data_collection_manager import DataCollectionManager
 from adaptive_prediction_system import AdaptivePredictionSystem
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ScheduledService:
     """運航便情報"""
     route_id: str
@@ -32,8 +33,9 @@ class ScheduledService:
     arrival_time: str
     service_number: int
     date: datetime
+    departure_hour: int  # departure_time の時（スケジュール生成時に算出）
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ForecastResult:
     """予報結果"""
     service: ScheduledService
@@ -45,6 +47,18 @@ class ForecastResult:
     confidence: float
     prediction_method: str  # "initial_rules", "hybrid", "ml_only"
 
+def _weather_column(weather_df: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    """気象DataFrameから列を取り出す（欠損・列なしは既定値）"""
+    if name not in weather_df:
+        return np.full(len(weather_df), default, dtype=float)
+    return weather_df[name].fillna(default).to_numpy(dtype=float)
+
+@functools.lru_cache(maxsize=8)
+def _load_ferry_schedules_cached(path: str, mtime: float) -> Dict:
+    """航路設定JSON読み込み（ファイル更新時刻をキーにキャッシュ）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 class FerryForecastUI:
     """フェリー運航予報UIシステム"""
     
@@ -74,8 +88,7 @@ class FerryForecastUI:
         """運航スケジュール読み込み"""
         try:
             config_file = self.base_dir / "config" / "ferry_routes.json"
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = _load_ferry_schedules_cached(str(config_file), config_file.stat().st_mtime)
             return config["ferry_routes"]
         except Exception as e:
             print(f"スケジュール読み込みエラー: {e}")
@@ -166,25 +179,40 @@ class FerryForecastUI:
                         departure_time=schedule["departure"],
                         arrival_time=schedule["arrival"],
                         service_number=schedule["service_number"],
-                        date=forecast_date
+                        date=forecast_date,
+                        departure_hour=int(schedule["departure"].split(":")[0])
                     )
                     services.append(service)
         
         return services
     
-    async def generate_forecast_for_service(self, service: ScheduledService) -> ForecastResult:
-        """個別運航便の予報生成"""
+    def _refresh_prediction_parameters(self) -> Dict:
+        """必要なら適応的調整を実行し、現在の予測パラメータを返す"""
+        # 適応的調整チェック・実行
+        if self.adaptive_system.should_trigger_adaptation():
+            self.adaptive_system.apply_adaptive_adjustments()
+        
+        # 現在の予測パラメータ取得
+        return self.adaptive_system.get_current_prediction_parameters()
+    
+    def generate_forecast_for_service(self, service: ScheduledService,
+                                      weather_conditions: Optional[Dict] = None,
+                                      blended_risk: Optional[float] = None,
+                                      primary_factors: Optional[List[str]] = None,
+                                      prediction_params: Optional[Dict] = None) -> ForecastResult:
+        """個別運航便の予報生成
+
+        weather_conditions / blended_risk / primary_factors は一括処理で事前計算済みの場合に渡す
+        prediction_params を渡した場合は適応的調整を行わずにそのパラメータを使う
+        """
         try:
-            # 適応的調整チェック・実行
-            if self.adaptive_system.should_trigger_adaptation():
-                self.adaptive_system.apply_adaptive_adjustments()
-            
-            # 現在の予測パラメータ取得
-            prediction_params = self.adaptive_system.get_current_prediction_parameters()
+            if prediction_params is None:
+                prediction_params = self._refresh_prediction_parameters()
             data_count = prediction_params["data_count"]
             
             # 気象データ取得（模擬）
-            weather_conditions = await self._get_weather_forecast(service.date, service.departure_time)
+            if weather_conditions is None:
+                weather_conditions = self._get_weather_forecast(service.date, service.departure_hour)
             
             # 予測方法選択（データ量に応じて）
             if data_count >= 200:
@@ -206,6 +234,13 @@ class FerryForecastUI:
                     risk_score, risk_level, confidence = self._apply_initial_rules(weather_conditions)
                     prediction_method = "initial_rules"
                     
+            elif data_count >= 50 and blended_risk is not None:
+                # 基本データ：一括計算済みの機械学習 + 初期ルール
+                risk_score = blended_risk
+                risk_level = self._determine_risk_level(risk_score)
+                confidence = 0.70
+                prediction_method = "hybrid"
+                
             elif data_count >= 50:
                 # 基本データ：機械学習 + 初期ルール
                 ml_result = self.data_integration.predict_with_ml_model(
@@ -231,7 +266,8 @@ class FerryForecastUI:
                 prediction_method = "initial_rules"
             
             # 主要要因特定
-            primary_factors = self._identify_primary_factors(weather_conditions, service.date.month)
+            if primary_factors is None:
+                primary_factors = self._identify_primary_factors(weather_conditions, service.date.month)
             
             # 推奨事項生成
             recommendation = self._generate_recommendation(risk_level, primary_factors, service)
@@ -292,6 +328,32 @@ class FerryForecastUI:
         
         return combined_risk, risk_level, confidence
     
+    def _apply_initial_rules_batch(self, weather_df: pd.DataFrame) -> np.ndarray:
+        """初期ルールベース予測の列演算版（複合リスクの配列を返す）"""
+        wind_speed = _weather_column(weather_df, "wind_speed", 0)
+        wave_height = _weather_column(weather_df, "wave_height", 0)
+        visibility = _weather_column(weather_df, "visibility", 20)
+        temperature = _weather_column(weather_df, "temperature", 0)
+        
+        # 適応的閾値取得
+        adapted_thresholds = self.adaptive_system.current_config["adapted_thresholds"]
+        wind_threshold = adapted_thresholds["wind_speed"]["medium"]
+        wave_threshold = adapted_thresholds["wave_height"]["medium"]
+        visibility_threshold = adapted_thresholds["visibility"]["medium"]
+        temp_threshold = adapted_thresholds["temperature"]["medium"]
+        
+        # _apply_initial_rules と同じ式を列単位で計算
+        wind_risk = np.minimum(100, wind_speed / wind_threshold * 100)
+        wave_risk = np.minimum(100, wave_height / wave_threshold * 100)
+        visibility_risk = np.maximum(0, (visibility_threshold - visibility) / visibility_threshold * 100)
+        temp_risk = np.where(
+            temperature < 0,
+            np.maximum(0, (temp_threshold - temperature) / 20 * 100),
+            0
+        )
+        
+        return wind_risk * 0.4 + wave_risk * 0.3 + visibility_risk * 0.2 + temp_risk * 0.1
+    
     def _determine_risk_level(self, risk_score: float) -> str:
         """リスクレベル判定"""
         if risk_score >= 80:
@@ -303,7 +365,7 @@ class FerryForecastUI:
         else:
             return "Low"
     
-    async def _get_weather_forecast(self, forecast_date: datetime, departure_time: str) -> Dict:
+    def _get_weather_forecast(self, forecast_date: datetime, hour: int) -> Dict:
         """気象予報取得（模擬データ）"""
         import random
         import numpy as np
@@ -313,7 +375,6 @@ class FerryForecastUI:
         is_winter = month in [11, 12, 1, 2, 3]
         
         # 時間帯の影響
-        hour = int(departure_time.split(':')[0])
         is_morning = hour < 12
         
         # 季節・時間帯を考慮した模擬データ
@@ -363,6 +424,39 @@ class FerryForecastUI:
         
         return factors if factors else ["良好な気象条件"]
     
+    def _identify_primary_factors_batch(self, weather_df: pd.DataFrame,
+                                        month_arr: np.ndarray) -> List[List[str]]:
+        """主要リスク要因特定の一括版（要因のある便だけ文字列を組み立てる）"""
+        wind_speed = _weather_column(weather_df, "wind_speed", 0)
+        wave_height = _weather_column(weather_df, "wave_height", 0)
+        visibility = _weather_column(weather_df, "visibility", 20)
+        temperature = _weather_column(weather_df, "temperature", 0)
+        
+        wind_mask = wind_speed >= self.initial_conditions["wind_speed_critical"] * 0.8
+        wave_mask = wave_height >= self.initial_conditions["wave_height_critical"] * 0.8
+        visibility_mask = visibility <= self.initial_conditions["visibility_critical"] * 1.5
+        temp_mask = ((temperature <= self.initial_conditions["temperature_critical"])
+                     & np.isin(month_arr, [11, 12, 1, 2, 3]))
+        drift_ice_mask = np.isin(month_arr, [2, 3]) & (temperature <= -5)
+        any_mask = wind_mask | wave_mask | visibility_mask | temp_mask | drift_ice_mask
+        
+        factors_list = [["良好な気象条件"] for _ in range(len(weather_df))]
+        for i in np.flatnonzero(any_mask):
+            factors = []
+            if wind_mask[i]:
+                factors.append(f"強風 ({wind_speed[i]:.1f}m/s)")
+            if wave_mask[i]:
+                factors.append(f"高波 ({wave_height[i]:.1f}m)")
+            if visibility_mask[i]:
+                factors.append(f"視界不良 ({visibility[i]:.1f}km)")
+            if temp_mask[i]:
+                factors.append(f"低温 ({temperature[i]:.1f}°C)")
+            if drift_ice_mask[i]:
+                factors.append("流氷リスク")
+            factors_list[i] = factors
+        
+        return factors_list
+    
     def _generate_recommendation(self, risk_level: str, factors: List[str], service: ScheduledService) -> str:
         """推奨事項生成"""
         if risk_level == "Critical":
@@ -400,22 +494,23 @@ class FerryForecastUI:
         # 日付別にグループ化
         services_by_date = {}
         for service in services:
-            date_key = service.date.strftime("%Y-%m-%d")
-            if date_key not in services_by_date:
-                services_by_date[date_key] = []
-            services_by_date[date_key].append(service)
-        
-        # 予報生成・表示
-        for date_key in sorted(services_by_date.keys()):
-            date_services = services_by_date[date_key]
-            forecast_date = datetime.strptime(date_key, "%Y-%m-%d")
-            
+            if service.date not in services_by_date:
+                services_by_date[service.date] = []
+            services_by_date[service.date].append(service)
+        
+        # 予報生成（適応的調整は全便で1度だけ行い、日付単位でまとめて予報する）
+        forecast_dates = sorted(services_by_date)
+        prediction_params = self._refresh_prediction_parameters()
+        forecasts_by_date = [
+            self._generate_forecasts_for_date(services_by_date[forecast_date], prediction_params)
+            for forecast_date in forecast_dates
+        ]
+        
+        # 予報表示
+        for forecast_date, forecasts in zip(forecast_dates, forecasts_by_date):
             print(f"📅 {forecast_date.strftime('%Y年%m月%d日 (%A)')}")
             print("-" * 80)
             
-            # 各便の予報を非同期で生成
-            forecasts = asyncio.run(self._generate_forecasts_for_date(date_services))
-            
             # 航路別に表示
             routes = {}
             for forecast in forecasts:
@@ -432,10 +527,48 @@ class FerryForecastUI:
             
             print("\n" + "=" * 80)
     
-    async def _generate_forecasts_for_date(self, services: List[ScheduledService]) -> List[ForecastResult]:
+    def _generate_forecasts_for_date(self, services: List[ScheduledService],
+                                     prediction_params: Optional[Dict] = None) -> List[ForecastResult]:
         """指定日の全便予報生成"""
-        tasks = [self.generate_forecast_for_service(service) for service in services]
-        return await asyncio.gather(*tasks)
+        if prediction_params is None:
+            prediction_params = self._refresh_prediction_parameters()
+        
+        weather_list = [
+            self._get_weather_forecast(service.date, service.departure_hour) for service in services
+        ]
+        weather_df = pd.DataFrame(weather_list)
+        blended_risks = self._blend_ml_and_rule_risks(services, weather_df, prediction_params["data_count"])
+        factors_list = self._identify_primary_factors_batch(
+            weather_df, np.array([service.date.month for service in services], dtype=int)
+        )
+        
+        return [
+            self.generate_forecast_for_service(service, weather, blended_risk, primary_factors, prediction_params)
+            for service, weather, blended_risk, primary_factors
+            in zip(services, weather_list, blended_risks, factors_list)
+        ]
+    
+    def _blend_ml_and_rule_risks(self, services: List[ScheduledService],
+                                 weather_df: pd.DataFrame, data_count: int) -> List[Optional[float]]:
+        """機械学習 + 初期ルールの重み付きリスクを全便まとめて計算"""
+        no_blend = [None] * len(services)
+        
+        if not services or not (50 <= data_count < 200):
+            return no_blend
+        
+        ml_proba = self.data_integration.predict_with_ml_model_batch(
+            weather_df,
+            [service.route_id for service in services],
+            [service.departure_time for service in services]
+        )
+        if ml_proba is None:
+            return no_blend
+        
+        rule_risks = self._apply_initial_rules_batch(weather_df)
+        
+        # 重み付き平均
+        risk_scores = ml_proba * 100 * 0.6 + rule_risks * 0.4
+        return risk_scores.tolist()
     
     def _display_service_forecast(self, forecast: ForecastResult):
         """個別便予報表示"""
@@ -510,7 +643,7 @@ class FerryForecastUI:
         """予報結果をJSONで出力"""
         try:
             services = self.generate_7day_schedule()
-            forecasts = asyncio.run(self._generate_forecasts_for_date(services))
+            forecasts = self._generate_forecasts_for_date(services)
             
             export_data = {
                 "generated_at": datetime.now().isoformat(),
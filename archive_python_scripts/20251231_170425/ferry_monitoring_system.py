@@ -11,32 +11,102 @@ Heartland Ferry Cancellation Monitoring System
 import requests
 from bs4 import BeautifulSoup
 import csv
+import functools
+import hashlib
+import io
 import json
+import os
+import re
+import signal
 import time
+import weakref
 from datetime import datetime, timedelta
 import asyncio
 import aiohttp
 import logging
-import schedule
+from collections import OrderedDict
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
 
-# ログ設定
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('ferry_monitoring.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
+# 欠航ログCSVの列（ヘッダー順）
+_CSV_FIELDS = (
+    "日付", "出航予定時刻", "出航場所", "着予定時刻", "着場所",
+    "運航状況", "欠航理由", "便名", "検知時刻",
+    "風速_ms", "波高_m", "視界_km", "気温_c", "備考"
 )
+_UNKNOWN_PORTS = {"出航場所": "不明", "着場所": "不明"}
+
+# 模擬気象データの範囲 (下限, 上限): [風速, 視界, 気温]
+_MOCK_WEATHER_RANGES = {
+    "winter": (np.array([8.0, 1.0, -15.0]), np.array([20.0, 15.0, 5.0])),
+    "summer": (np.array([3.0, 5.0, 5.0]), np.array([12.0, 20.0, 25.0])),
+}
+
+# 高速JSONライブラリ（未導入時は標準jsonを使用）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# HTMLパーサー（setup_monitoring.py で導入される lxml を優先）
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# ログ設定（呼び出し側で既に設定済みの場合はそちらを優先）
 logger = logging.getLogger(__name__)
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('ferry_monitoring.log', encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+# 運航状況テキストの抽出・判定パターン（判定は上から順に）
+_STATUS_RE = re.compile(r'運航|欠航|遅延')
+_STATUS_TABLE = [
+    (re.compile(r'平常通りの運航'), '通常運航'),
+    (re.compile(r'欠航'), '欠航'),
+    (re.compile(r'遅延'), '遅延'),
+]
+
+# 通知対象の運航状況（状況文字列に含まれるキーワード → 通知種別）
+_NOTIFICATION_KINDS = (
+    ("欠航", "cancellation"),
+    ("遅延", "delay"),
+)
+
+# 欠航理由判定キーワード（上から順に判定）
+_REASON_PATTERNS = [
+    ("強風", re.compile("強風|風")),
+    ("高波", re.compile("波|高波")),
+    ("濃霧", re.compile("霧|視界")),
+    ("低温", re.compile("低温|凍結")),
+    ("流氷", re.compile("流氷|海氷")),
+    ("降雪", re.compile("雪|吹雪")),
+    ("荒天", re.compile("気象|荒天")),
+]
+
+@functools.lru_cache(maxsize=8)
+def _load_route_config_cached(path: str, mtime: float) -> Dict:
+    """航路設定JSON読み込み（ファイル更新時刻をキーにキャッシュ）"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
 class FerryMonitoringSystem:
     """フェリー欠航監視システム"""
     
-    def __init__(self):
+    def __init__(self, durable: bool = False):
         self.base_dir = Path(__file__).parent
         self.data_dir = self.base_dir / "data"
         self.data_dir.mkdir(exist_ok=True)
@@ -44,6 +114,14 @@ class FerryMonitoringSystem:
         # CSVファイルパス
         self.csv_file = self.data_dir / "ferry_cancellation_log.csv"
         
+        # True の場合、書き込みごとに fsync してクラッシュ時のデータ欠損を防ぐ
+        self.durable = durable
+        self._csv_fh = None
+        self._csv_writer = None
+        
+        # 記録済みデータ件数（起動時に1度だけ数え、以降は追記件数で更新）
+        self._row_count = 0
+        
         # データ収集制限
         self.max_data_count = 500
         self.auto_stop_enabled = True
@@ -78,12 +156,42 @@ class FerryMonitoringSystem:
         # 航路情報
         self.routes = self._load_route_config()
         
+        # 航路ごとのCSV行の固定値（出航場所・着場所）
+        self._row_defaults = {
+            route_id: {
+                "出航場所": route.get("departure", {}).get("port", "不明"),
+                "着場所": route.get("arrival", {}).get("port", "不明")
+            }
+            for route_id, route in self.routes.items()
+        }
+        
         # 前回の運航状況（変化検知用）
         self.previous_status = {}
         
         # 気象データAPI設定
         self.weather_api_key = None  # 必要に応じて設定
         
+        # 気象データキャッシュ: (lat, lon) -> (取得時刻, データ)
+        self._weather_cache: "OrderedDict[Tuple[float, float], Tuple[float, Dict]]" = OrderedDict()
+        self.weather_cache_ttl = 600  # 秒
+        # 取得中の地点: (lat, lon) -> 取得タスク（同時に来た同一地点の要求を1回の取得にまとめる）
+        self._weather_inflight: Dict[Tuple[float, float], "asyncio.Task[Dict]"] = {}
+        
+        # 模擬気象データ用の乱数生成器
+        self._rng = np.random.default_rng()
+        
+        # HTTPセッション（接続プールを監視サイクル間で再利用）
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # ステータスページのキャッシュ（未変更時は解析を省略）
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._body_hash: Optional[bytes] = None
+        self._last_status_info: Optional[Dict] = None
+        
+        # 航路並列処理時のCSV書き込み直列化用ロック
+        self._csv_lock = asyncio.Lock()
+        
         # CSV初期化
         self._initialize_csv()
         
@@ -91,8 +199,7 @@ class FerryMonitoringSystem:
         """航路設定読み込み"""
         config_file = self.base_dir / "config" / "ferry_routes.json"
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = _load_route_config_cached(str(config_file), config_file.stat().st_mtime)
             return config["ferry_routes"]
         except FileNotFoundError:
             logger.warning("航路設定ファイルが見つかりません。デフォルト設定を使用します。")
@@ -121,56 +228,97 @@ class FerryMonitoringSystem:
     def _initialize_csv(self):
         """CSVファイル初期化"""
         if not self.csv_file.exists():
-            headers = [
-                "日付", "出航予定時刻", "出航場所", "着予定時刻", "着場所",
-                "運航状況", "欠航理由", "便名", "検知時刻", 
-                "風速_ms", "波高_m", "視界_km", "気温_c", "備考"
-            ]
-            
             with open(self.csv_file, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow(headers)
+                writer.writerow(_CSV_FIELDS)
             
-            logger.info(f"CSVファイルを初期化しました: {self.csv_file}")
+            logger.info("CSVファイルを初期化しました: %s", self.csv_file)
+        else:
+            self._row_count = self._count_csv_rows()
+        
+        # 追記用ハンドルは監視システムの破棄時（またはプロセス終了時）まで開いたままにする
+        self._csv_fh = open(self.csv_file, 'a', newline='', encoding='utf-8', buffering=1 << 20)
+        self._csv_writer = csv.DictWriter(self._csv_fh, fieldnames=_CSV_FIELDS)
+        weakref.finalize(self, self._csv_fh.close)
+    
+    def _count_csv_rows(self) -> int:
+        """CSVデータ件数（ヘッダー除く）を数える（備考欄の改行を含むレコードも1件）"""
+        with open(self.csv_file, 'r', newline='', encoding='utf-8') as f:
+            return max(0, sum(1 for _ in csv.reader(f)) - 1)
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """HTTPセッション取得（初回のみ生成）"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=10, ttl_dns_cache=300, keepalive_timeout=75)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def aclose(self):
+        """HTTPセッションのクローズ"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        
+        if self.line_system is not None:
+            await self.line_system.aclose()
     
     async def check_ferry_status(self) -> Dict:
         """フェリー運航状況チェック"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.status_url, timeout=30) as response:
-                    if response.status != 200:
-                        logger.error(f"ステータスページ取得失敗: {response.status}")
-                        return {}
-                    
-                    html = await response.text()
-                    return self._parse_status_page(html)
-                    
+            # 前回の応答が残っていれば条件付きGETで変更有無を確認
+            headers = {}
+            if self._last_status_info is not None:
+                if self._etag:
+                    headers["If-None-Match"] = self._etag
+                if self._last_modified:
+                    headers["If-Modified-Since"] = self._last_modified
+            
+            session = await self._get_session()
+            async with session.get(self.status_url, headers=headers,
+                                   timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status == 304:
+                    return self._last_status_info
+                
+                if response.status != 200:
+                    logger.error("ステータスページ取得失敗: %s", response.status)
+                    return {}
+                
+                html = await response.text()
+                self._etag = response.headers.get("ETag")
+                self._last_modified = response.headers.get("Last-Modified")
+            
+            # 内容が前回と同一なら解析を省略
+            body_hash = hashlib.sha1(html.encode('utf-8')).digest()
+            if body_hash == self._body_hash and self._last_status_info is not None:
+                return self._last_status_info
+            
+            # HTML解析はCPU処理のためワーカースレッドで実行（他の航路処理を止めない）
+            status_info = await asyncio.to_thread(self._parse_status_page, html)
+            self._body_hash = body_hash
+            self._last_status_info = status_info
+            return status_info
+                
         except Exception as e:
-            logger.error(f"運航状況チェックでエラー: {e}")
+            logger.error("運航状況チェックでエラー: %s", e)
             return {}
     
     def _parse_status_page(self, html: str) -> Dict:
         """運航状況ページ解析"""
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = BeautifulSoup(html, HTML_PARSER)
             status_info = {}
             
             # 利尻・礼文航路の情報を取得
             # ※実際のHTML構造に合わせて調整が必要
-            status_elements = soup.find_all(['div', 'p', 'span'], 
-                                          text=lambda text: text and ('運航' in text or '欠航' in text))
+            status_elements = soup.find_all(['div', 'p', 'span'], string=_STATUS_RE)
             
             for element in status_elements:
                 text = element.get_text().strip()
-                if '平常通りの運航' in text:
-                    status_info['status'] = '通常運航'
-                    status_info['message'] = text
-                elif '欠航' in text:
-                    status_info['status'] = '欠航'
-                    status_info['message'] = text
-                elif '遅延' in text:
-                    status_info['status'] = '遅延'
-                    status_info['message'] = text
+                for pattern, status in _STATUS_TABLE:
+                    if pattern.search(text):
+                        status_info['status'] = status
+                        status_info['message'] = text
+                        break
             
             # デフォルト設定
             if not status_info:
@@ -182,51 +330,62 @@ class FerryMonitoringSystem:
             return status_info
             
         except Exception as e:
-            logger.error(f"ステータスページ解析でエラー: {e}")
+            logger.error("ステータスページ解析でエラー: %s", e)
             return {'status': 'エラー', 'message': str(e)}
     
     async def get_weather_data(self, lat: float, lon: float) -> Dict:
         """気象データ取得（OpenWeatherMap等のAPI使用）"""
+        # 同一地点（出航港が共通の航路など）はTTL内ならキャッシュを返す
+        key = (round(lat, 3), round(lon, 3))
+        now = time.monotonic()
+        cached = self._weather_cache.get(key)
+        if cached is not None and now - cached[0] < self.weather_cache_ttl:
+            return cached[1]
+        
+        task = self._weather_inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load_weather_data(key, lat, lon, now))
+            self._weather_inflight[key] = task
+            task.add_done_callback(lambda _: self._weather_inflight.pop(key, None))
+        
+        # 待っている呼び出し側がキャンセルされても共有の取得は止めない
+        return await asyncio.shield(task)
+    
+    async def _load_weather_data(self, key: Tuple[float, float], lat: float, lon: float,
+                                 now: float) -> Dict:
+        """気象データを取得してキャッシュに格納"""
         try:
             # 気象データAPI（実装例）
             # ※実際にはAPIキーと適切なエンドポイントが必要
             if not self.weather_api_key:
                 # フォールバック: 模擬データ
-                return self._get_mock_weather_data()
+                weather_data = self._get_mock_weather_data()
+            else:
+                # 実装予定: 実際の気象データAPI呼び出し
+                weather_data = await self._fetch_real_weather_data(lat, lon)
             
-            # 実装予定: 実際の気象データAPI呼び出し
-            return await self._fetch_real_weather_data(lat, lon)
+            self._weather_cache[key] = (now, weather_data)
+            self._weather_cache.move_to_end(key)
+            if len(self._weather_cache) > 64:
+                self._weather_cache.popitem(last=False)
+            return weather_data
             
         except Exception as e:
-            logger.warning(f"気象データ取得でエラー: {e}")
+            logger.warning("気象データ取得でエラー: %s", e)
             return self._get_mock_weather_data()
     
     def _get_mock_weather_data(self) -> Dict:
         """模擬気象データ"""
-        import random
-        
-        # 季節を考慮した模擬データ
+        # 季節を考慮した模擬データ（風速・視界・気温を1回の呼び出しで生成）
         current_month = datetime.now().month
         is_winter = current_month in [11, 12, 1, 2, 3]
-        
-        if is_winter:
-            wind_speed = random.uniform(8, 20)
-            temperature = random.uniform(-15, 5)
-            visibility = random.uniform(1, 15)
-        else:
-            wind_speed = random.uniform(3, 12)
-            temperature = random.uniform(5, 25)
-            visibility = random.uniform(5, 20)
+        low, high = _MOCK_WEATHER_RANGES["winter" if is_winter else "summer"]
+        wind_speed, visibility, temperature = self._rng.uniform(low, high)
         
         # 風速から波高を簡易推定
-        wave_height = wind_speed * 0.25
+        values = np.round([wind_speed, wind_speed * 0.25, visibility, temperature], 1)
         
-        return {
-            "wind_speed": round(wind_speed, 1),
-            "wave_height": round(wave_height, 1),
-            "visibility": round(visibility, 1),
-            "temperature": round(temperature, 1)
-        }
+        return dict(zip(("wind_speed", "wave_height", "visibility", "temperature"), values.tolist()))
     
     async def _fetch_real_weather_data(self, lat: float, lon: float) -> Dict:
         """実際の気象データ取得"""
@@ -235,30 +394,16 @@ class FerryMonitoringSystem:
     
     def _extract_cancellation_details(self, status_message: str) -> Tuple[str, str]:
         """欠航詳細情報抽出"""
-        reason = "不明"
-        
         # キーワードによる理由判定
-        if any(word in status_message for word in ['強風', '風']):
-            reason = "強風"
-        elif any(word in status_message for word in ['波', '高波']):
-            reason = "高波"
-        elif any(word in status_message for word in ['霧', '視界']):
-            reason = "濃霧"
-        elif any(word in status_message for word in ['低温', '凍結']):
-            reason = "低温"
-        elif any(word in status_message for word in ['流氷', '海氷']):
-            reason = "流氷"
-        elif any(word in status_message for word in ['雪', '吹雪']):
-            reason = "降雪"
-        elif any(word in status_message for word in ['気象', '荒天']):
-            reason = "荒天"
-        
-        return reason, status_message
+        for reason, pattern in _REASON_PATTERNS:
+            if pattern.search(status_message):
+                return reason, status_message
+        
+        return "不明", status_message
     
     async def record_cancellation(self, route_id: str, status_info: Dict, weather_data: Dict):
         """欠航情報をCSVに記録"""
         try:
-            route = self.routes.get(route_id, {})
             current_time = datetime.now()
             
             # 今日の時刻表から該当便を特定（簡易版）
@@ -266,34 +411,43 @@ class FerryMonitoringSystem:
             
             reason, message = self._extract_cancellation_details(status_info.get('message', ''))
             
+            # 全便共通の値はループ外で1回だけ求める
+            common_fields = {
+                **self._row_defaults.get(route_id, _UNKNOWN_PORTS),
+                "日付": current_time.strftime("%Y-%m-%d"),
+                "運航状況": status_info.get("status", "不明"),
+                "欠航理由": reason,
+                "検知時刻": current_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "風速_ms": weather_data.get("wind_speed", ""),
+                "波高_m": weather_data.get("wave_height", ""),
+                "視界_km": weather_data.get("visibility", ""),
+                "気温_c": weather_data.get("temperature", ""),
+                "備考": message
+            }
+            
+            rows = [
+                {
+                    **common_fields,
+                    "出航予定時刻": schedule.get("departure_time", "不明"),
+                    "着予定時刻": schedule.get("arrival_time", "不明"),
+                    "便名": schedule.get("service_name", f"{route_id}_{schedule.get('departure_time', '')}")
+                }
+                for schedule in schedules
+            ]
+            
+            # CSVファイルに一括追記（バッチごとにフラッシュ）
+            async with self._csv_lock:
+                self._csv_writer.writerows(rows)
+                self._csv_fh.flush()
+                if self.durable:
+                    os.fsync(self._csv_fh.fileno())
+                self._row_count += len(rows)
+            
             for schedule in schedules:
-                # CSVに追記
-                row_data = [
-                    current_time.strftime("%Y-%m-%d"),  # 日付
-                    schedule.get("departure_time", "不明"),  # 出航予定時刻
-                    route.get("departure", {}).get("port", "不明"),  # 出航場所
-                    schedule.get("arrival_time", "不明"),  # 着予定時刻
-                    route.get("arrival", {}).get("port", "不明"),  # 着場所
-                    status_info.get("status", "不明"),  # 運航状況
-                    reason,  # 欠航理由
-                    schedule.get("service_name", f"{route_id}_{schedule.get('departure_time', '')}"),  # 便名
-                    current_time.strftime("%Y-%m-%d %H:%M:%S"),  # 検知時刻
-                    weather_data.get("wind_speed", ""),  # 風速
-                    weather_data.get("wave_height", ""),  # 波高
-                    weather_data.get("visibility", ""),  # 視界
-                    weather_data.get("temperature", ""),  # 気温
-                    message  # 備考
-                ]
-                
-                # CSVファイルに追記
-                with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(row_data)
-                
-                logger.info(f"欠航情報を記録しました: {route_id} - {schedule.get('departure_time')}")
+                logger.info("欠航情報を記録しました: %s - %s", route_id, schedule.get('departure_time'))
         
         except Exception as e:
-            logger.error(f"欠航情報記録でエラー: {e}")
+            logger.error("欠航情報記録でエラー: %s", e)
     
     def _get_daily_schedule(self, route_id: str) -> List[Dict]:
         """当日の運航スケジュール取得（簡易版）"""
@@ -324,25 +478,21 @@ class FerryMonitoringSystem:
             if not self.auto_stop_enabled:
                 return False
             
-            if not self.csv_file.exists():
-                return False
-            
-            df = pd.read_csv(self.csv_file, encoding='utf-8')
-            current_count = len(df)
+            current_count = self._row_count
             
             if current_count >= self.max_data_count:
-                logger.info(f"データ収集上限に達しました: {current_count}/{self.max_data_count}件")
+                logger.info("データ収集上限に達しました: %s/%s件", current_count, self.max_data_count)
                 logger.info("監視を自動終了します。十分なデータが蓄積されました。")
                 return True
                 
             elif current_count >= self.max_data_count * 0.9:  # 90%到達で警告
                 remaining = self.max_data_count - current_count
-                logger.warning(f"データ収集上限まで残り{remaining}件です")
+                logger.warning("データ収集上限まで残り%s件です", remaining)
                 
             return False
             
         except Exception as e:
-            logger.error(f"データ上限チェックでエラー: {e}")
+            logger.error("データ上限チェックでエラー: %s", e)
             return False
 
     async def monitor_all_routes(self):
@@ -359,91 +509,104 @@ class FerryMonitoringSystem:
             # 運航状況チェック
             status_info = await self.check_ferry_status()
             
-            for route_id, route_data in self.routes.items():
-                try:
-                    # 気象データ取得
-                    departure_lat = route_data["departure"]["lat"]
-                    departure_lon = route_data["departure"]["lon"]
-                    weather_data = await self.get_weather_data(departure_lat, departure_lon)
-                    
-                    # 状況変化チェック
-                    current_status = status_info.get("status", "不明")
-                    previous_status = self.previous_status.get(route_id, "不明")
-                    
-                    # 欠航・遅延の場合、または状況が変化した場合に記録
-                    if (current_status in ["欠航", "遅延"] or 
-                        current_status != previous_status):
-                        
-                        await self.record_cancellation(route_id, status_info, weather_data)
-                        
-                        # Slackやメール通知（オプション）
-                        await self._send_notification(route_id, status_info)
-                    
-                    # 前回状況を更新
-                    self.previous_status[route_id] = current_status
-                    
-                except Exception as e:
-                    logger.error(f"航路 {route_id} の監視でエラー: {e}")
+            # 航路ごとの処理を並列実行
+            route_ids = list(self.routes)
+            results = await asyncio.gather(
+                *[self._process_route(route_id, self.routes[route_id], status_info) for route_id in route_ids],
+                return_exceptions=True
+            )
+            
+            for route_id, result in zip(route_ids, results):
+                if isinstance(result, Exception):
+                    logger.error("航路 %s の監視でエラー: %s", route_id, result)
                     
         except Exception as e:
-            logger.error(f"全体監視でエラー: {e}")
+            logger.error("全体監視でエラー: %s", e)
+    
+    async def _process_route(self, route_id: str, route_data: Dict, status_info: Dict):
+        """航路単位の監視処理"""
+        # 気象データ取得
+        departure_lat = route_data["departure"]["lat"]
+        departure_lon = route_data["departure"]["lon"]
+        weather_data = await self.get_weather_data(departure_lat, departure_lon)
+        
+        # 状況変化チェック
+        current_status = status_info.get("status", "不明")
+        previous_status = self.previous_status.get(route_id, "不明")
+        
+        # 欠航・遅延の場合、または状況が変化した場合に記録
+        if (current_status in ["欠航", "遅延"] or 
+            current_status != previous_status):
+            
+            await self.record_cancellation(route_id, status_info, weather_data)
+            
+            # Slackやメール通知（オプション）
+            await self._send_notification(route_id, status_info)
+        
+        # 前回状況を更新
+        self.previous_status[route_id] = current_status
     
     async def _send_notification(self, route_id: str, status_info: Dict):
-        """通知送信（Discord通知機能）"""
+        """通知送信（Discord・LINEへ並列送信）"""
         route_name = self.routes.get(route_id, {}).get("route_name", route_id)
         message = f"【フェリー運航情報】{route_name}: {status_info.get('message', '')}"
-        logger.info(f"通知: {message}")
+        logger.info("通知: %s", message)
         
-        # Discord通知送信
-        if self.discord_enabled and self.discord_system:
-            try:
-                status = status_info.get("status", "不明")
-                
-                # 欠航の場合は緊急アラート
-                if "欠航" in status:
-                    await self.discord_system.send_cancellation_alert(
-                        route_name=route_name,
-                        departure_time="複数便", 
-                        reason=status_info.get("message", "気象条件不良")
-                    )
-                # 遅延の場合は通常通知
-                elif "遅延" in status:
-                    embed = {
-                        "title": "🟡 フェリー運航遅延",
-                        "color": 0xFFFF00,
-                        "fields": [
-                            {"name": "航路", "value": route_name, "inline": True},
-                            {"name": "状況", "value": status, "inline": True}
-                        ]
-                    }
-                    await self.discord_system.send_discord_message(embed=embed)
-                
-            except Exception as e:
-                logger.error(f"Discord通知送信エラー: {e}")
+        status = status_info.get("status", "不明")
+        kind = next((kind for keyword, kind in _NOTIFICATION_KINDS if keyword in status), None)
+        if kind is None:
+            return
         
-        # LINE通知送信
+        detail = status_info.get("message", "")
+        channels = []
+        if self.discord_enabled and self.discord_system:
+            channels.append(("Discord", self._notify_discord(route_name, kind, status, detail)))
         if self.line_enabled and self.line_system:
-            try:
-                status = status_info.get("status", "不明")
-                
-                # 欠航の場合は緊急アラート
-                if "欠航" in status:
-                    await self.line_system.send_cancellation_alert(
-                        route_name=route_name,
-                        departure_time="複数便",
-                        reason=status_info.get("message", "気象条件不良")
-                    )
-                # 遅延の場合は通常通知
-                elif "遅延" in status:
-                    text = f"🟡 フェリー運航遅延\n\n"
-                    text += f"🚢 航路: {route_name}\n"
-                    text += f"📊 状況: {status}\n"
-                    text += f"詳細: {status_info.get('message', '')}"
-                    message = self.line_system.create_text_message(text)
-                    await self.line_system.broadcast_to_all_targets(message)
-                
-            except Exception as e:
-                logger.error(f"LINE通知送信エラー: {e}")
+            channels.append(("LINE", self._notify_line(route_name, kind, status, detail)))
+        
+        results = await asyncio.gather(*[coro for _, coro in channels], return_exceptions=True)
+        for (channel, _), result in zip(channels, results):
+            if isinstance(result, Exception):
+                logger.error("%s通知送信エラー: %s", channel, result)
+    
+    async def _notify_discord(self, route_name: str, kind: str, status: str, message: str):
+        """Discord通知送信"""
+        # 欠航の場合は緊急アラート
+        if kind == "cancellation":
+            await self.discord_system.send_cancellation_alert(
+                route_name=route_name,
+                departure_time="複数便", 
+                reason=message or "気象条件不良"
+            )
+        # 遅延の場合は通常通知
+        else:
+            embed = {
+                "title": "🟡 フェリー運航遅延",
+                "color": 0xFFFF00,
+                "fields": [
+                    {"name": "航路", "value": route_name, "inline": True},
+                    {"name": "状況", "value": status, "inline": True}
+                ]
+            }
+            await self.discord_system.send_discord_message(embed=embed)
+    
+    async def _notify_line(self, route_name: str, kind: str, status: str, message: str):
+        """LINE通知送信"""
+        # 欠航の場合は緊急アラート
+        if kind == "cancellation":
+            await self.line_system.send_cancellation_alert(
+                route_name=route_name,
+                departure_time="複数便",
+                reason=message or "気象条件不良"
+            )
+        # 遅延の場合は通常通知
+        else:
+            text = f"🟡 フェリー運航遅延\n\n"
+            text += f"🚢 航路: {route_name}\n"
+            text += f"📊 状況: {status}\n"
+            text += f"詳細: {message}"
+            line_message = self.line_system.create_text_message(text)
+            await self.line_system.broadcast_to_all_targets(line_message)
     
     def _create_completion_report(self):
         """データ収集完了レポート作成"""
@@ -451,6 +614,9 @@ class FerryMonitoringSystem:
             df = self.generate_summary_report()
             completion_time = datetime.now()
             
+            # 運航状況ごとの件数（1回の集計で全区分）
+            status_counts = df['運航状況'].value_counts() if not df.empty else pd.Series(dtype=int)
+            
             report = {
                 "completion_time": completion_time.isoformat(),
                 "total_records": len(df),
@@ -459,9 +625,9 @@ class FerryMonitoringSystem:
                     "end": df['日付'].max() if not df.empty else None
                 },
                 "statistics": {
-                    "cancellation_count": len(df[df['運航状況'] == '欠航']) if not df.empty else 0,
-                    "delay_count": len(df[df['運航状況'] == '遅延']) if not df.empty else 0,
-                    "normal_count": len(df[df['運航状況'] == '通常運航']) if not df.empty else 0
+                    "cancellation_count": int(status_counts.get('欠航', 0)),
+                    "delay_count": int(status_counts.get('遅延', 0)),
+                    "normal_count": int(status_counts.get('通常運航', 0))
                 },
                 "status": "DATA_COLLECTION_COMPLETED",
                 "recommendation": "予測システムの高精度運用が可能です。定期的なモデル更新を推奨します。"
@@ -469,45 +635,116 @@ class FerryMonitoringSystem:
             
             # 完了レポートファイル保存
             report_file = self.data_dir / "data_collection_completion_report.json"
-            with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(report, f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                report_file.write_bytes(
+                    orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+                )
+            else:
+                with open(report_file, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, ensure_ascii=False, indent=2)
             
-            logger.info(f"データ収集完了レポートを作成しました: {report_file}")
-            logger.info(f"総収集データ数: {report['total_records']}件")
+            logger.info("データ収集完了レポートを作成しました: %s", report_file)
+            logger.info("総収集データ数: %s件", report['total_records'])
             
         except Exception as e:
-            logger.error(f"完了レポート作成でエラー: {e}")
+            logger.error("完了レポート作成でエラー: %s", e)
 
     def start_monitoring(self, interval_minutes: int = 30):
         """定期監視開始"""
-        logger.info(f"定期監視を開始します（{interval_minutes}分間隔）")
+        logger.info("定期監視を開始します（%s分間隔）", interval_minutes)
         
         # 初回データ上限チェック
         if self.check_data_limit():
             return
         
-        # スケジュール設定
-        def scheduled_monitor():
-            result = asyncio.run(self.monitor_all_routes())
-            # False が返された場合は監視終了
-            return result is not False
+        # 定期実行（単一のイベントループ・HTTPセッションで継続）
+        logger.info("定期監視を開始しました。データ上限に達すると自動終了します。")
+        asyncio.run(self._run_forever(interval_minutes))
+        logger.info("定期監視を終了します")
+    
+    async def _run_forever(self, interval_minutes: int):
+        """監視ループ（データ上限到達またはSIGINTで終了）"""
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGINT, stop_event.set)
+            signal_handler_installed = True
+        except NotImplementedError:
+            # Windows では KeyboardInterrupt で停止する
+            signal_handler_installed = False
         
-        schedule.every(interval_minutes).minutes.do(scheduled_monitor)
+        interval_seconds = interval_minutes * 60
+        next_tick = time.monotonic()
+        try:
+            while not stop_event.is_set():
+                # False が返された場合は監視終了
+                if await self.monitor_all_routes() is False:
+                    break
+                
+                # 実行時間に関係なく一定間隔を保つ（ずれを累積させない）
+                next_tick += interval_seconds
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=max(0, next_tick - time.monotonic()))
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            logger.info("監視タスクがキャンセルされました")
+        finally:
+            if signal_handler_installed:
+                loop.remove_signal_handler(signal.SIGINT)
+            await self.aclose()
+    
+    async def run_once(self):
+        """1回分の全航路監視（手動実行用）"""
+        try:
+            return await self.monitor_all_routes()
+        finally:
+            await self.aclose()
+    
+    def _tail_csv(self, n: int = 20) -> pd.DataFrame:
+        """CSV末尾n件の読み込み（通常はファイル末尾の最大64KBだけを読む）
+
+        備考欄は引用符付きで改行を含みうるため、物理行ではなくCSVレコード単位で数える
+        """
+        if not self.csv_file.exists():
+            return pd.DataFrame()
         
-        # 初回実行
-        if not asyncio.run(self.monitor_all_routes()):
-            return
+        with open(self.csv_file, 'rb') as f:
+            header = f.readline()
+            file_size = f.seek(0, os.SEEK_END)
+            start = max(len(header), file_size - 64 * 1024)
+            f.seek(start)
+            tail = f.read()
         
-        # 定期実行
-        logger.info("定期監視を開始しました。データ上限に達すると自動終了します。")
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # 1分毎にスケジュールチェック
-            
-            # データ上限チェック（定期確認）
-            if self.check_data_limit():
-                logger.info("定期監視を終了します")
-                break
+        fields = next(csv.reader([header.decode('utf-8')]), [])
+        partial = start > len(header)
+        
+        # 途中から読んだ場合は最初の改行までを捨てる（UTF-8の文字境界もここで揃う）
+        if partial:
+            tail = tail.partition(b'\n')[2]
+        
+        try:
+            records = list(csv.reader(io.StringIO(tail.decode('utf-8'), newline=''), strict=True))
+        except (csv.Error, UnicodeDecodeError):
+            records = None
+        
+        # 途中から読んだ場合、先頭レコードは複数行レコードの続きかもしれないため捨てる
+        if records is not None and partial:
+            records = records[1:]
+        
+        # 引用符の対応が崩れて列数が合わない、または件数が足りない場合は全体を読む
+        if (records is None
+                or any(len(record) != len(fields) for record in records)
+                or (partial and len(records) < n)):
+            with open(self.csv_file, 'r', newline='', encoding='utf-8') as f:
+                records = list(csv.reader(f))[1:]
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        writer.writerows(records[-n:] if n > 0 else [])
+        buffer.seek(0)
+        return pd.read_csv(buffer)
     
     def generate_summary_report(self) -> pd.DataFrame:
         """蓄積データのサマリーレポート生成"""
@@ -524,18 +761,18 @@ class FerryMonitoringSystem:
             
             # 基本統計
             total_records = len(df)
-            cancellation_count = len(df[df['運航状況'] == '欠航'])
+            cancellation_count = int(df['運航状況'].value_counts().get('欠航', 0))
             cancellation_rate = (cancellation_count / total_records * 100) if total_records > 0 else 0
             
-            logger.info(f"蓄積データサマリー:")
-            logger.info(f"  総記録数: {total_records}")
-            logger.info(f"  欠航記録数: {cancellation_count}")
-            logger.info(f"  欠航率: {cancellation_rate:.1f}%")
+            logger.info("蓄積データサマリー:")
+            logger.info("  総記録数: %s", total_records)
+            logger.info("  欠航記録数: %s", cancellation_count)
+            logger.info("  欠航率: %.1f%%", cancellation_rate)
             
             return df
             
         except Exception as e:
-            logger.error(f"サマリーレポート生成でエラー: {e}")
+            logger.error("サマリーレポート生成でエラー: %s", e)
             return pd.DataFrame()
 
 def main():
@@ -547,13 +784,14 @@ def main():
     try:
         # 手動実行（テスト用）
         print("手動監視を実行します...")
-        asyncio.run(monitor.monitor_all_routes())
+        asyncio.run(monitor.run_once())
         
         # サマリーレポート表示
         print("\n現在の蓄積データ:")
-        summary_df = monitor.generate_summary_report()
-        if not summary_df.empty:
-            print(summary_df.tail())
+        print(f"記録数: {monitor._row_count}件")
+        recent_df = monitor._tail_csv(5)
+        if not recent_df.empty:
+            print(recent_df)
         
         # 定期監視開始の選択
         choice = input("\n定期監視を開始しますか？ (y/n): ")
@@ -576,7 +814,7 @@ def main():
     except KeyboardInterrupt:
         print("\n監視を停止しました")
     except Exception as e:
-        logger.error(f"メイン実行でエラー: {e}")
+        logger.error("メイン実行でエラー: %s", e)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
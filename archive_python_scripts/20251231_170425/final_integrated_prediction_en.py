@@ -5,17 +5,21 @@ Final Integrated Transport Prediction System - English Version
 Simplified, stable version combining ferry and flight predictions
 """
 
+import functools
+from bisect import bisect_right
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 # Use our initial prediction models
-from initial_flight_prediction_model import InitialFlightPredictor, FlightPredictionInput
+from initial_flight_prediction_model import InitialFlightPredictor, FlightPredictionBatch
+from utils_numba import FERRY_FACTORS, _NUMBA_AVAILABLE, ferry_risk
 
-@dataclass
+@dataclass(slots=True)
 class TransportSummary:
     """Transport prediction summary"""
     transport_type: str
@@ -26,6 +30,50 @@ class TransportSummary:
     primary_factor: str
     recommendation: str
 
+# Risk level table: bisect_right(_THRESH, prob) indexes _LEVELS and the recommendations
+_THRESH = (0.3, 0.6)
+_LEVELS = ("LOW", "MEDIUM", "HIGH")
+_RECOMMENDATIONS = {
+    "Ferry": (
+        "Normal operation expected.",
+        "Possible delays. Allow extra time.",
+        "High cancellation risk. Consider alternative transport."
+    ),
+    "Flight": (
+        "Normal operation expected.",
+        "Possible delays. Check latest information.",
+        "High cancellation risk. Consider ferry transport."
+    )
+}
+
+def _risk_level_for(prob: float, transport_type: str) -> Tuple[str, str]:
+    """Risk level and recommendation for a cancellation probability"""
+    index = bisect_right(_THRESH, prob)
+    return _LEVELS[index], _RECOMMENDATIONS[transport_type][index]
+
+# Terrain risk assumed for every flight slot
+_MOUNTAIN_WAVE_MEDIUM = "medium"
+
+# Weather record layout; one structured scalar replaces the weather dict
+WEATHER_DTYPE = np.dtype([
+    ("temperature", "f4"), ("humidity", "f4"), ("wind_speed", "f4"), ("wind_direction", "i2"),
+    ("visibility", "f4"), ("pressure", "f4"), ("precipitation", "f4")
+])
+
+# Weather summary templates; the precipitation suffix is appended only when it rains
+_SUMMARY_FMT = "Temp: {temperature:.1f}C, Humidity: {humidity:.0f}%, Wind: {wind_speed:.1f}kt, Visibility: {visibility_km:.1f}km"
+_SUMMARY_PRECIP = ", Precip: {precipitation:.1f}mm/h"
+
+def make_weather_record(weather_data: Dict, base: Optional[np.void] = None) -> np.void:
+    """Build a WEATHER_DTYPE record from a weather dict, starting from base if given"""
+    record = np.zeros(1, dtype=WEATHER_DTYPE)
+    if base is not None:
+        record[0] = base
+    for field, value in weather_data.items():
+        if field in WEATHER_DTYPE.fields:
+            record[field] = value
+    return record[0]
+
 class FinalIntegratedSystem:
     """Final integrated transport prediction system"""
     
@@ -33,16 +81,17 @@ class FinalIntegratedSystem:
         self.flight_predictor = InitialFlightPredictor()
         
         # Current weather conditions (would be from API in production)
-        self.current_weather = {
+        self.current_weather = make_weather_record({
             "temperature": 18.0,
             "humidity": 75.0,
             "wind_speed": 12.0,
             "wind_direction": 280,
             "visibility": 6000.0,
             "pressure": 1012.0,
-            "precipitation": 0.5,
-            "timestamp": datetime.now()
-        }
+            "precipitation": 0.5
+        })
+        self._weather_ts = None
+        self._weather_ts_dirty = True
         
         # Transport schedules
         self.ferry_schedules = {
@@ -55,199 +104,270 @@ class FinalIntegratedSystem:
             "Okadama-Rishiri": ["08:30", "14:05", "16:45"],
             "New Chitose-Rishiri": ["09:15", "15:30"]
         }
+        
+        # Route/time slots flattened once; the predictors iterate these directly
+        self._ferry_slots = [
+            (route, time) for route, times in self.ferry_schedules.items() for time in times
+        ]
+        self._flight_slots = [
+            (route, time) for route, times in self.flight_schedules.items() for time in times
+        ]
+        self._flight_hours = np.array([int(time.split(":")[0]) for _, time in self._flight_slots])
+        
+        # Best-option labels for every slot, ferries first as in the full forecast
+        self._slot_labels = np.array(
+            [f"Ferry: {route}" for route, _ in self._ferry_slots]
+            + [f"Flight: {route}" for route, _ in self._flight_slots]
+        )
+        
+        # Pay the JIT compile cost up front rather than on the first forecast
+        if _NUMBA_AVAILABLE:
+            ferry_risk(0.0, 0.0, 0.0)
+        
+        # Flight scores and forecasts memoized on the weather values and month (per-instance caches)
+        self._flight_scores_cached = functools.lru_cache(maxsize=256)(self._build_flight_scores)
+        self._forecast_cached = functools.lru_cache(maxsize=64)(self._build_forecast)
     
     def update_weather_conditions(self, weather_data: Dict):
         """Update current weather conditions"""
-        self.current_weather.update(weather_data)
-        self.current_weather["timestamp"] = datetime.now()
+        for field, value in weather_data.items():
+            if field in WEATHER_DTYPE.fields:
+                self.current_weather[field] = value
+        self._weather_ts_dirty = True
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Weather timestamp, sampled on first read after each update"""
+        if self._weather_ts_dirty:
+            self._weather_ts = datetime.now()
+            self._weather_ts_dirty = False
+        return self._weather_ts
+    
+    def _forecast_key(self) -> Tuple[Tuple[float, ...], int]:
+        """Everything a forecast depends on: the current weather values and the month
+        
+        The record's field values are hashable and identify the weather exactly;
+        the flight model also depends on the month.
+        """
+        return self.current_weather.item(), datetime.now().month
+    
+    def _score_ferry(self, weather_key: Tuple[float, ...]) -> Tuple[str, str, float, str]:
+        """Ferry risk level, recommendation, probability and primary factor for the given weather"""
+        
+        # Key fields follow WEATHER_DTYPE order
+        _, _, ws, _, vis, _, precip = weather_key
+        
+        # Ferry risk depends only on the weather, so score it once for all slots
+        risk_score, factor = ferry_risk(ws, vis, precip)
+        
+        risk_level, recommendation = _risk_level_for(risk_score, "Ferry")
+        
+        return risk_level, recommendation, min(risk_score, 0.95), FERRY_FACTORS[factor]
+    
+    def _build_flight_scores(self, weather_key: Tuple[float, ...], month: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Flight scores for all slots (cached per weather values and month)
+        
+        The returned arrays are shared between calls and are made read-only.
+        """
+        
+        # Key fields follow WEATHER_DTYPE order
+        temperature, humidity, ws, wind_direction, vis, pressure, precip = weather_key
+        sea_temp_diff = abs(temperature - 12.0)
+        
+        # Broadcast the shared weather over all route/time slots
+        batch = FlightPredictionBatch.from_weather_broadcast(
+            month, self._flight_hours, temperature, humidity, ws, wind_direction,
+            vis, pressure, precip, sea_temp_diff, _MOUNTAIN_WAVE_MEDIUM
+        )
+        
+        # One vectorized model pass for all slots
+        probability, primary_factor = self.flight_predictor.calculate_overall_prediction_batch(batch)
+        
+        # Same table as _risk_level_for, looked up for every slot at once
+        index = np.digitize(probability, _THRESH)
+        risk_level = np.asarray(_LEVELS)[index]
+        recommendation = np.asarray(_RECOMMENDATIONS["Flight"])[index]
+        
+        scores = (risk_level, recommendation, probability, primary_factor)
+        for array in scores:
+            array.setflags(write=False)
+        
+        return scores
+    
+    @contextmanager
+    def _weather_override(self, weather_data: Dict):
+        """Temporarily replace the current weather, restoring it on exit"""
+        original_state = (self.current_weather, self._weather_ts, self._weather_ts_dirty)
+        self.current_weather = make_weather_record(weather_data, base=original_state[0])
+        self._weather_ts_dirty = True
+        try:
+            yield
+        finally:
+            self.current_weather, self._weather_ts, self._weather_ts_dirty = original_state
     
     def predict_ferry_operations(self) -> List[TransportSummary]:
         """Predict ferry operations using rule-based system"""
-        
-        predictions = []
-        weather = self.current_weather
-        
-        for route, times in self.ferry_schedules.items():
-            for time in times:
-                
-                # Ferry-specific risk calculation
-                risk_score = 0.0
-                risk_factors = []
-                
-                # Wind risk
-                if weather["wind_speed"] > 25:
-                    risk_score += 0.6
-                    risk_factors.append("Strong wind")
-                elif weather["wind_speed"] > 18:
-                    risk_score += 0.3
-                    risk_factors.append("Moderate wind")
-                
-                # Wave height estimation
-                estimated_wave_height = weather["wind_speed"] * 0.2
-                if estimated_wave_height > 3.0:
-                    risk_score += 0.4
-                    risk_factors.append("High waves")
-                
-                # Visibility
-                if weather["visibility"] < 1000:
-                    risk_score += 0.5
-                    risk_factors.append("Poor visibility")
-                elif weather["visibility"] < 3000:
-                    risk_score += 0.2
-                    risk_factors.append("Reduced visibility")
-                
-                # Precipitation
-                if weather["precipitation"] > 10:
-                    risk_score += 0.3
-                    risk_factors.append("Heavy rain")
-                elif weather["precipitation"] > 5:
-                    risk_score += 0.1
-                    risk_factors.append("Rain")
-                
-                # Determine risk level
-                if risk_score >= 0.6:
-                    risk_level = "HIGH"
-                    recommendation = "High cancellation risk. Consider alternative transport."
-                elif risk_score >= 0.3:
-                    risk_level = "MEDIUM"
-                    recommendation = "Possible delays. Allow extra time."
-                else:
-                    risk_level = "LOW"
-                    recommendation = "Normal operation expected."
-                
-                primary_factor = risk_factors[0] if risk_factors else "Good conditions"
-                
-                predictions.append(TransportSummary(
-                    transport_type="Ferry",
-                    route=route,
-                    scheduled_time=time,
-                    cancellation_risk=risk_level,
-                    probability=min(risk_score, 0.95),
-                    primary_factor=primary_factor,
-                    recommendation=recommendation
-                ))
-        
-        return predictions
+        return self._ferry_summaries(self.current_weather.item())
+    
+    def _ferry_summaries(self, weather_key: Tuple[float, ...]) -> List[TransportSummary]:
+        """Ferry summaries for every slot under the given weather"""
+        
+        risk_level, recommendation, probability, primary_factor = self._score_ferry(weather_key)
+        
+        return [
+            TransportSummary(
+                transport_type="Ferry",
+                route=route,
+                scheduled_time=time,
+                cancellation_risk=risk_level,
+                probability=probability,
+                primary_factor=primary_factor,
+                recommendation=recommendation
+            )
+            for route, time in self._ferry_slots
+        ]
     
     def predict_flight_operations(self) -> List[TransportSummary]:
         """Predict flight operations using advanced model"""
+        return self._flight_summaries(*self._forecast_key())
+    
+    def _flight_summaries(self, weather_key: Tuple[float, ...], month: int) -> List[TransportSummary]:
+        """Flight summaries for every slot under the given weather and month"""
+        
+        risk_level, recommendation, probability, primary_factor = self._flight_scores_cached(weather_key, month)
+        
+        return [
+            TransportSummary(
+                transport_type="Flight",
+                route=route,
+                scheduled_time=time,
+                cancellation_risk=level,
+                probability=prob,
+                primary_factor=factor,
+                recommendation=advice
+            )
+            for (route, time), level, advice, prob, factor in zip(
+                self._flight_slots, risk_level.tolist(), recommendation.tolist(),
+                probability.tolist(), primary_factor.tolist()
+            )
+        ]
+    
+    def _risk_levels_only(self) -> Tuple[int, int, int, str]:
+        """High/medium/low slot counts and best option, without building summaries"""
         
-        predictions = []
-        weather = self.current_weather
-        
-        for route, times in self.flight_schedules.items():
-            for time in times:
-                
-                # Create flight prediction input
-                flight_input = FlightPredictionInput(
-                    flight_date=datetime.now(),
-                    flight_time=time,
-                    route=route,
-                    temperature=weather["temperature"],
-                    humidity=weather["humidity"],
-                    wind_speed=weather["wind_speed"],
-                    wind_direction=weather["wind_direction"],
-                    visibility=weather["visibility"],
-                    pressure=weather["pressure"],
-                    precipitation=weather["precipitation"],
-                    sea_temperature_diff=abs(weather["temperature"] - 12.0),
-                    mountain_wave_risk="medium"
-                )
-                
-                # Get prediction
-                prediction = self.flight_predictor.calculate_overall_prediction(flight_input)
-                
-                # Convert to risk level
-                prob = prediction.cancellation_probability
-                if prob >= 0.6:
-                    risk_level = "HIGH"
-                    recommendation = "High cancellation risk. Consider ferry transport."
-                elif prob >= 0.3:
-                    risk_level = "MEDIUM"
-                    recommendation = "Possible delays. Check latest information."
-                else:
-                    risk_level = "LOW"
-                    recommendation = "Normal operation expected."
-                
-                predictions.append(TransportSummary(
-                    transport_type="Flight",
-                    route=route,
-                    scheduled_time=time,
-                    cancellation_risk=risk_level,
-                    probability=prob,
-                    primary_factor=prediction.primary_risk_factor,
-                    recommendation=recommendation
-                ))
-        
-        return predictions
+        weather_key, month = self._forecast_key()
+        ferry_level = self._score_ferry(weather_key)[0]
+        flight_levels = self._flight_scores_cached(weather_key, month)[0]
+        
+        risk_levels = np.concatenate([np.full(len(self._ferry_slots), ferry_level), flight_levels])
+        high_risk_count = int(np.count_nonzero(risk_levels == "HIGH"))
+        medium_risk_count = int(np.count_nonzero(risk_levels == "MEDIUM"))
+        low_slots = np.flatnonzero(risk_levels == "LOW")
+        
+        best_option = str(self._slot_labels[low_slots[0]]) if low_slots.size else "All routes have risk factors."
+        
+        return high_risk_count, medium_risk_count, int(low_slots.size), best_option
+    
+    @staticmethod
+    def _overall_status(high_risk_count: int, medium_risk_count: int) -> Tuple[str, str]:
+        """Overall status and message for the given risk counts"""
+        
+        if high_risk_count > 0:
+            return "CAUTION - High Risk", f"{high_risk_count} routes have high cancellation risk."
+        if medium_risk_count > 0:
+            return "WARNING - Medium Risk", f"{medium_risk_count} routes may experience delays."
+        return "GOOD - Low Risk", "Normal operations expected for all routes."
+    
+    def get_integrated_forecast_lite(self) -> Dict:
+        """Summary fields of the integrated forecast only (no per-route predictions)"""
+        
+        high_risk_count, medium_risk_count, low_risk_count, best_option = self._risk_levels_only()
+        overall_status, _ = self._overall_status(high_risk_count, medium_risk_count)
+        
+        return {
+            "overall_status": overall_status,
+            "high_risk_routes": high_risk_count,
+            "medium_risk_routes": medium_risk_count,
+            "low_risk_routes": low_risk_count,
+            "best_option": best_option
+        }
     
     def get_integrated_forecast(self) -> Dict:
         """Get integrated transport forecast"""
         
-        ferry_predictions = self.predict_ferry_operations()
-        flight_predictions = self.predict_flight_operations()
+        forecast = self._forecast_cached(*self._forecast_key())
+        
+        # Hand out fresh lists and summaries so callers cannot alter the cached forecast
+        return {
+            "timestamp": self.timestamp,
+            **forecast,
+            "ferry_predictions": [replace(p) for p in forecast["ferry_predictions"]],
+            "flight_predictions": [replace(p) for p in forecast["flight_predictions"]]
+        }
+    
+    def _build_forecast(self, weather_key: Tuple[float, ...], month: int) -> Dict:
+        """Integrated forecast for the given weather values and month (cached on both)"""
+        
+        ferry_predictions = self._ferry_summaries(weather_key)
+        flight_predictions = self._flight_summaries(weather_key, month)
         
         all_predictions = ferry_predictions + flight_predictions
         
-        # Generate overall assessment
-        high_risk_count = len([p for p in all_predictions if p.cancellation_risk == "HIGH"])
-        medium_risk_count = len([p for p in all_predictions if p.cancellation_risk == "MEDIUM"])
+        # Count risk levels and find the first low-risk option in one pass
+        high_risk_count = medium_risk_count = 0
+        first_low = None
+        for p in all_predictions:
+            risk = p.cancellation_risk
+            if risk == "HIGH":
+                high_risk_count += 1
+            elif risk == "MEDIUM":
+                medium_risk_count += 1
+            elif first_low is None:
+                first_low = p
+        low_risk_count = len(all_predictions) - high_risk_count - medium_risk_count
         
-        if high_risk_count > 0:
-            overall_status = "CAUTION - High Risk"
-            overall_message = f"{high_risk_count} routes have high cancellation risk."
-        elif medium_risk_count > 0:
-            overall_status = "WARNING - Medium Risk" 
-            overall_message = f"{medium_risk_count} routes may experience delays."
-        else:
-            overall_status = "GOOD - Low Risk"
-            overall_message = "Normal operations expected for all routes."
+        # Generate overall assessment
+        overall_status, overall_message = self._overall_status(high_risk_count, medium_risk_count)
         
         # Best options recommendation
-        low_risk_options = [p for p in all_predictions if p.cancellation_risk == "LOW"]
-        if low_risk_options:
-            recommended_transport = low_risk_options[0].transport_type
-            recommended_route = low_risk_options[0].route
+        if first_low is not None:
+            recommended_transport = first_low.transport_type
+            recommended_route = first_low.route
             best_option = f"{recommended_transport}: {recommended_route}"
         else:
             best_option = "All routes have risk factors."
         
         return {
-            "timestamp": self.current_weather["timestamp"],
             "overall_status": overall_status,
             "overall_message": overall_message,
             "best_option": best_option,
-            "ferry_predictions": ferry_predictions,
-            "flight_predictions": flight_predictions,
-            "weather_summary": self._generate_weather_summary(),
+            "ferry_predictions": tuple(ferry_predictions),
+            "flight_predictions": tuple(flight_predictions),
+            "weather_summary": self._generate_weather_summary(weather_key),
             "total_routes_checked": len(all_predictions),
             "high_risk_routes": high_risk_count,
             "medium_risk_routes": medium_risk_count,
-            "low_risk_routes": len(all_predictions) - high_risk_count - medium_risk_count
+            "low_risk_routes": low_risk_count
         }
     
-    def _generate_weather_summary(self) -> str:
-        """Generate current weather summary"""
+    def _generate_weather_summary(self, weather_key: Tuple[float, ...]) -> str:
+        """Generate weather summary"""
         
-        weather = self.current_weather
-        
-        summary_parts = []
-        summary_parts.append(f"Temp: {weather['temperature']:.1f}C")
-        summary_parts.append(f"Humidity: {weather['humidity']:.0f}%")
-        summary_parts.append(f"Wind: {weather['wind_speed']:.1f}kt")
-        summary_parts.append(f"Visibility: {weather['visibility']/1000:.1f}km")
+        weather = dict(zip(WEATHER_DTYPE.names, weather_key))
+        weather["visibility_km"] = weather["visibility"] / 1000
         
+        summary = _SUMMARY_FMT.format_map(weather)
         if weather["precipitation"] > 0:
-            summary_parts.append(f"Precip: {weather['precipitation']:.1f}mm/h")
+            summary += _SUMMARY_PRECIP.format_map(weather)
         
-        return ", ".join(summary_parts)
+        return summary
     
     def generate_text_report(self) -> str:
         """Generate text-based forecast report"""
         
         forecast = self.get_integrated_forecast()
         
-        report = f"""
+        parts = [f"""
 === Hokkaido Transport Forecast Report ===
 Updated: {forecast['timestamp'].strftime('%Y-%m-%d %H:%M')}
 
@@ -260,23 +380,23 @@ Updated: {forecast['timestamp'].strftime('%Y-%m-%d %H:%M')}
 [CURRENT WEATHER]
 {forecast['weather_summary']}
 
-[FERRY OPERATIONS FORECAST]"""
+[FERRY OPERATIONS FORECAST]"""]
         
         for pred in forecast['ferry_predictions']:
             risk_icon = "HIGH" if pred.cancellation_risk == "HIGH" else "MED" if pred.cancellation_risk == "MEDIUM" else "LOW"
-            report += f"\n[{risk_icon}] {pred.route} {pred.scheduled_time}"
-            report += f"\n      Risk: {pred.cancellation_risk} ({pred.probability:.1%})"
-            report += f"\n      Factor: {pred.primary_factor}"
+            parts.append(f"\n[{risk_icon}] {pred.route} {pred.scheduled_time}")
+            parts.append(f"\n      Risk: {pred.cancellation_risk} ({pred.probability:.1%})")
+            parts.append(f"\n      Factor: {pred.primary_factor}")
         
-        report += f"\n\n[FLIGHT OPERATIONS FORECAST]"
+        parts.append("\n\n[FLIGHT OPERATIONS FORECAST]")
         
         for pred in forecast['flight_predictions']:
             risk_icon = "HIGH" if pred.cancellation_risk == "HIGH" else "MED" if pred.cancellation_risk == "MEDIUM" else "LOW"
-            report += f"\n[{risk_icon}] {pred.route} {pred.scheduled_time}"
-            report += f"\n      Risk: {pred.cancellation_risk} ({pred.probability:.1%})"
-            report += f"\n      Factor: {pred.primary_factor}"
+            parts.append(f"\n[{risk_icon}] {pred.route} {pred.scheduled_time}")
+            parts.append(f"\n      Risk: {pred.cancellation_risk} ({pred.probability:.1%})")
+            parts.append(f"\n      Factor: {pred.primary_factor}")
         
-        report += f"""
+        parts.append(f"""
 
 [STATISTICS]
 Total Routes Checked: {forecast['total_routes_checked']}
@@ -286,9 +406,9 @@ Low Risk Routes: {forecast['low_risk_routes']}
 
 This forecast is based on weather conditions.
 Please check with transport operators for latest information.
-"""
+""")
         
-        return report
+        return "".join(parts)
     
     def simulate_different_weather(self) -> Dict:
         """Simulate predictions under different weather scenarios"""
@@ -323,26 +443,10 @@ Please check with transport operators for latest information.
         
         scenario_results = {}
         
-        # Save original weather
-        original_weather = self.current_weather.copy()
-        
         for scenario_name, weather_condition in scenarios.items():
-            # Update weather
-            self.update_weather_conditions(weather_condition)
-            
-            # Get predictions
-            forecast = self.get_integrated_forecast()
-            
-            scenario_results[scenario_name] = {
-                "overall_status": forecast["overall_status"],
-                "high_risk_routes": forecast["high_risk_routes"],
-                "medium_risk_routes": forecast["medium_risk_routes"],
-                "low_risk_routes": forecast["low_risk_routes"],
-                "best_option": forecast["best_option"]
-            }
-        
-        # Restore original weather
-        self.current_weather = original_weather
+            # Only the summary fields are reported per scenario
+            with self._weather_override(weather_condition):
+                scenario_results[scenario_name] = self.get_integrated_forecast_lite()
         
         return scenario_results
 
@@ -8,21 +8,68 @@ FlightAware API Integration System
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
+import functools
 import json
 import csv
-import pandas as pd
-from datetime import datetime, timedelta
+import random
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
-import time
 import logging
 from pathlib import Path
 import os
 from dataclasses import dataclass
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from billing_protection_system import ProtectedFlightAwareClient
 
+# aiohttpが無い環境ではスレッドプールで並行取得する
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# 大きなAPIレスポンスは可能ならorjsonで高速にデコードする
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 過去日の運航データは変わらないため、あればディスクキャッシュを使う
+try:
+    from requests_cache import CachedSession
+except ImportError:
+    CachedSession = None
+
+# 429時の指数バックオフ（未導入時は同じ方針の簡易実装）
+try:
+    from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+except ImportError:
+    AsyncRetrying = None
+
+# 日ごとのレスポンスキャッシュの保存先と有効期間（7日）
+FLIGHT_CACHE_NAME = ".fa_cache"
+FLIGHT_CACHE_EXPIRE_SECONDS = 7 * 24 * 60 * 60
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# API制限を避けるための同時リクエスト数上限
+MAX_CONCURRENT_REQUESTS = 5
+
+# 429時の再試行回数と待機時間の上限（秒）
+RATE_LIMIT_ATTEMPTS = 5
+RATE_LIMIT_MAX_WAIT = 120
+
+# 1日分で辿るlinks.nextの上限（max_pagesでまとめて返った分の続き）
+MAX_FOLLOW_PAGES = 5
+
+class RateLimited(Exception):
+    """APIがHTTP 429を返した"""
+
 @dataclass
 class FlightData:
     """フライトデータクラス"""
@@ -41,6 +88,16 @@ class FlightData:
     cancellation_reason: Optional[str]
     aircraft_type: Optional[str]
 
+# この件数以上はpandasのgroupbyで集計する（少数ならPythonの1回走査の方が速い）
+FRAME_ANALYSIS_MIN_FLIGHTS = 10000
+
+# CSV出力の列順
+FLIGHT_CSV_FIELDS = (
+    "flight_id", "airline", "flight_number", "departure_airport", "arrival_airport",
+    "scheduled_departure", "actual_departure", "scheduled_arrival", "actual_arrival",
+    "status", "delay_minutes", "cancelled", "cancellation_reason", "aircraft_type"
+)
+
 class FlightAwareAPI:
     """FlightAware API統合クラス"""
     
@@ -51,6 +108,24 @@ class FlightAwareAPI:
             "x-apikey": api_key or "YOUR_API_KEY_HERE"
         }
         
+        # 同期リクエスト用の永続セッション（接続プール＋リトライ、可能ならSQLiteキャッシュ）
+        if CachedSession is not None:
+            self.session = CachedSession(
+                FLIGHT_CACHE_NAME,
+                backend="sqlite",
+                allowable_methods=["GET"],
+                expire_after=FLIGHT_CACHE_EXPIRE_SECONDS
+            )
+        else:
+            self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=1.5, status_forcelist=[429, 502, 503])
+        )
+        self.session.mount("https://", adapter)
+        
         # 利尻空港関連の空港コード
         self.airports = {
             "rishiri": {"icao": "RJER", "iata": "RIS", "name": "利尻空港"},
@@ -97,6 +172,7 @@ class FlightAwareAPI:
                     if "flightaware" in config:
                         self.api_key = config["flightaware"]
                         self.headers["x-apikey"] = self.api_key
+                        self.session.headers["x-apikey"] = self.api_key
                         print("✅ APIキーを設定ファイルから読み込みました")
                         return True
             except Exception as e:
@@ -107,6 +183,7 @@ class FlightAwareAPI:
         if env_key:
             self.api_key = env_key
             self.headers["x-apikey"] = self.api_key
+            self.session.headers["x-apikey"] = self.api_key
             print("✅ APIキーを環境変数から読み込みました")
             return True
         
@@ -122,7 +199,10 @@ class FlightAwareAPI:
                 "query": "-destination RJER -maxPages 1"
             }
             
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
+            # 接続テストはキャッシュを使わず毎回APIに問い合わせる
+            no_cache = self.session.cache_disabled() if CachedSession is not None else nullcontext()
+            with no_cache:
+                response = self.session.get(url, params=params, timeout=10)
             
             if response.status_code == 200:
                 logger.info("✅ FlightAware API接続成功")
@@ -141,74 +221,222 @@ class FlightAwareAPI:
             logger.error(f"❌ 接続エラー: {e}")
             return False
     
-    def get_airport_flights(self, airport_code: str, start_date: datetime, 
-                          end_date: datetime, direction: str = "departures") -> List[Dict]:
-        """空港の運航データ取得"""
-        
-        flights_data = []
-        current_date = start_date
+    async def _get_page_once(self, session: "aiohttp.ClientSession", semaphore: asyncio.Semaphore,
+                             url: str, params: Optional[Dict], label: str) -> Optional[Dict]:
+        """1ページ分のJSON取得（429はRateLimitedを送出、その他の失敗はNone）"""
         
-        while current_date <= end_date:
-            try:
-                # API endpoint
-                url = f"{self.base_url}/airports/{airport_code}/flights/{direction}"
-                
-                params = {
-                    "start": current_date.isoformat(),
-                    "end": (current_date + timedelta(days=1)).isoformat(),
-                    "max_pages": 5
-                }
-                
-                logger.info(f"取得中: {airport_code} {direction} {current_date.date()}")
-                
-                response = requests.get(url, headers=self.headers, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if "flights" in data:
-                        for flight in data["flights"]:
-                            flights_data.append(flight)
-                        logger.info(f"✅ {len(data['flights'])}便のデータを取得")
-                    else:
-                        logger.info("📭 該当する便がありません")
-                        
-                elif response.status_code == 429:
-                    logger.warning("⏳ API制限に達しました。60秒待機...")
-                    time.sleep(60)
-                    continue
-                    
-                else:
-                    logger.error(f"❌ APIエラー: {response.status_code}")
-                
-                # API制限を避けるため少し待機
-                time.sleep(2)
+        try:
+            async with semaphore:
+                logger.info(f"取得中: {label}")
                 
-            except Exception as e:
-                logger.error(f"データ取得エラー: {e}")
+                async with session.get(url, params=params) as response:
+                    status = response.status
+                    if status == 200:
+                        body = await response.read()
+                        return orjson.loads(body) if orjson is not None else json.loads(body)
             
-            current_date += timedelta(days=1)
+        except Exception as e:
+            logger.error(f"データ取得エラー: {e}")
+            return None
         
-        return flights_data
+        if status == 429:
+            logger.warning("⏳ API制限に達しました。待機して再試行します...")
+            raise RateLimited(label)
+        
+        logger.error(f"❌ APIエラー: {status}")
+        return None
+    
+    async def _get_page(self, session: "aiohttp.ClientSession", semaphore: asyncio.Semaphore,
+                        url: str, params: Optional[Dict], label: str) -> Optional[Dict]:
+        """1ページ分のJSON取得（429時は指数バックオフで再試行、失敗時はNone）"""
+        
+        # 待機はセマフォの外で行うため、待機中は同時実行枠を解放しておける
+        try:
+            if AsyncRetrying is not None:
+                async for attempt in AsyncRetrying(
+                    wait=wait_exponential_jitter(initial=1, max=RATE_LIMIT_MAX_WAIT),
+                    stop=stop_after_attempt(RATE_LIMIT_ATTEMPTS),
+                    retry=retry_if_exception_type(RateLimited),
+                    reraise=True
+                ):
+                    with attempt:
+                        return await self._get_page_once(session, semaphore, url, params, label)
+            
+            for attempt in range(RATE_LIMIT_ATTEMPTS):
+                try:
+                    return await self._get_page_once(session, semaphore, url, params, label)
+                except RateLimited:
+                    if attempt == RATE_LIMIT_ATTEMPTS - 1:
+                        raise
+                    await asyncio.sleep(min(RATE_LIMIT_MAX_WAIT, 2 ** attempt) + random.uniform(0, 1))
+        
+        except RateLimited:
+            logger.error(f"❌ API制限が解除されませんでした: {label}")
+            return None
+    
+    async def _fetch_day(self, session: "aiohttp.ClientSession", semaphore: asyncio.Semaphore,
+                         url: str, label: str, day: datetime) -> List[Dict]:
+        """1日分の運航データ取得"""
+        
+        # 並行リクエストごとに別のparamsが必要
+        params = {
+            "start": day.isoformat(),
+            "end": (day + timedelta(days=1)).isoformat(),
+            "max_pages": 5
+        }
+        label = f"{label} {day.date()}"
+        
+        flights = []
+        data = await self._get_page(session, semaphore, url, params, label)
+        
+        # 続きのページはカーソル（links.next）で連鎖するため順に辿る
+        pages_followed = 0
+        while data is not None:
+            flights.extend(data.get("flights", []))
+            next_path = (data.get("links") or {}).get("next")
+            if not next_path or pages_followed >= MAX_FOLLOW_PAGES:
+                break
+            pages_followed += 1
+            data = await self._get_page(session, semaphore, self.base_url + next_path, None, label)
+        
+        if flights:
+            logger.info(f"✅ {len(flights)}便のデータを取得")
+        elif data is not None:
+            logger.info("📭 該当する便がありません")
+        
+        return flights
+    
+    async def get_airport_flights(self, session: "aiohttp.ClientSession", semaphore: asyncio.Semaphore,
+                                  airport_code: str, start_date: datetime, end_date: datetime,
+                                  direction: str = "departures") -> List[Dict]:
+        """空港の運航データ取得（日ごとのリクエストを並行実行）"""
+        
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        
+        # API endpoint（全日共通）
+        url = f"{self.base_url}/airports/{airport_code}/flights/{direction}"
+        label = f"{airport_code} {direction}"
+        
+        daily_flights = await asyncio.gather(
+            *[self._fetch_day(session, semaphore, url, label, day) for day in days]
+        )
+        
+        return [flight for flights in daily_flights for flight in flights]
+    
+    def _get_page_sync(self, url: str, params: Optional[Dict], label: str,
+                       cacheable: bool = True) -> Optional[Dict]:
+        """1ページ分のJSON取得（スレッドプール用、失敗時はNone）"""
+        
+        logger.info(f"取得中: {label}")
+        
+        # 終わっていない期間はキャッシュせず毎回取得する
+        # （cache_disabled()はセッション全体に効くため、並行取得中はリクエスト単位で指定）
+        kwargs = {"expire_after": 0} if CachedSession is not None and not cacheable else {}
+        
+        try:
+            # 429はセッションのRetry設定でバックオフ再試行される
+            response = self.session.get(url, params=params, timeout=30, **kwargs)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"データ取得エラー: {e}")
+            return None
+        
+        if response.status_code != 200:
+            logger.error(f"❌ APIエラー: {response.status_code}")
+            return None
+        
+        return orjson.loads(response.content) if orjson is not None else response.json()
+    
+    def _fetch_one_day(self, url: str, label: str, day: datetime) -> List[Dict]:
+        """1日分の運航データ取得（スレッドプール用）"""
+        
+        # 並行リクエストごとに別のparamsが必要
+        params = {
+            "start": day.isoformat(),
+            "end": (day + timedelta(days=1)).isoformat(),
+            "max_pages": 5
+        }
+        label = f"{label} {day.date()}"
+        
+        # 期間の終わりが現在より後なら、まだ便が増えうるのでキャッシュしない
+        cacheable = day + timedelta(days=1) <= datetime.now(timezone.utc)
+        
+        flights = []
+        data = self._get_page_sync(url, params, label, cacheable)
+        
+        # 続きのページはカーソル（links.next）で連鎖するため順に辿る
+        pages_followed = 0
+        while data is not None:
+            flights.extend(data.get("flights", []))
+            next_path = (data.get("links") or {}).get("next")
+            if not next_path or pages_followed >= MAX_FOLLOW_PAGES:
+                break
+            pages_followed += 1
+            data = self._get_page_sync(self.base_url + next_path, None, label, cacheable)
+        
+        if flights:
+            logger.info(f"✅ {len(flights)}便のデータを取得")
+        elif data is not None:
+            logger.info("📭 該当する便がありません")
+        
+        return flights
+    
+    def get_airport_flights_threaded(self, airport_code: str, start_date: datetime,
+                                     end_date: datetime, direction: str = "departures") -> List[Dict]:
+        """空港の運航データ取得（スレッドプール版）"""
+        
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        
+        # API endpoint（全日共通）
+        url = f"{self.base_url}/airports/{airport_code}/flights/{direction}"
+        label = f"{airport_code} {direction}"
+        
+        # 同時実行数はワーカー数で制限する
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            daily_flights = list(executor.map(
+                lambda day: self._fetch_one_day(url, label, day), days
+            ))
+        
+        return [flight for flights in daily_flights for flight in flights]
+    
+    async def _collect_both_directions_async(self, start_date: datetime,
+                                             end_date: datetime) -> Tuple[List[Dict], List[Dict]]:
+        """発着両方向の運航データを1つのセッションで並行取得"""
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        async with aiohttp.ClientSession(headers=self.headers,
+                                         timeout=aiohttp.ClientTimeout(total=30)) as session:
+            return tuple(await asyncio.gather(
+                self.get_airport_flights(session, semaphore, "RJER", start_date, end_date, "departures"),
+                self.get_airport_flights(session, semaphore, "RJER", start_date, end_date, "arrivals")
+            ))
     
     def collect_rishiri_flight_history(self, days_back: int = 90) -> Dict:
         """利尻空港90日分のフライト履歴収集"""
         
-        end_date = datetime.now()
+        # 取得期間をUTCの0時に揃え、再実行時も同じリクエスト（キャッシュキー）になるようにする
+        end_date = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
         start_date = end_date - timedelta(days=days_back)
         
         logger.info(f"📊 利尻空港フライト履歴収集開始: {start_date.date()} - {end_date.date()}")
         
+        # キャッシュ付きセッションがあれば、終了済みの日はAPIを呼ばずに済むスレッド版を使う
+        if CachedSession is not None:
+            self.session.cache.delete(expired=True)
+        
+        if aiohttp is not None and CachedSession is None:
+            departures, arrivals = asyncio.run(self._collect_both_directions_async(start_date, end_date))
+        else:
+            departures = self.get_airport_flights_threaded("RJER", start_date, end_date, "departures")
+            arrivals = self.get_airport_flights_threaded("RJER", start_date, end_date, "arrivals")
+        
         all_flights = []
         
         # 利尻空港発便
-        departures = self.get_airport_flights("RJER", start_date, end_date, "departures")
         for flight in departures:
             flight["direction"] = "departure"
         all_flights.extend(departures)
         
         # 利尻空港着便
-        arrivals = self.get_airport_flights("RJER", start_date, end_date, "arrivals")
         for flight in arrivals:
             flight["direction"] = "arrival"
         all_flights.extend(arrivals)
@@ -226,68 +454,75 @@ class FlightAwareAPI:
         """生データをFlightDataオブジェクトに変換"""
         
         processed_flights = []
+        skipped = 0
         
+        # 必須項目は事前に検証し、想定外のエラーは握りつぶさず呼び出し元に伝える
         for flight in raw_flights:
-            try:
-                # 基本情報取得
-                flight_id = flight.get("fa_flight_id", "")
-                airline = flight.get("operator", "").split()[0] if flight.get("operator") else ""
-                flight_number = flight.get("flight_number", "")
-                
-                # 空港情報
-                departure_airport = flight.get("origin", {}).get("code", "")
-                arrival_airport = flight.get("destination", {}).get("code", "")
-                
-                # 時刻情報
-                scheduled_departure = self._parse_datetime(flight.get("scheduled_out"))
-                actual_departure = self._parse_datetime(flight.get("actual_out"))
-                scheduled_arrival = self._parse_datetime(flight.get("scheduled_in"))
-                actual_arrival = self._parse_datetime(flight.get("actual_in"))
-                
-                # ステータス情報
-                status = flight.get("status", "")
-                cancelled = status in ["Cancelled", "Canceled"]
-                
-                # 遅延計算
-                delay_minutes = 0
-                if actual_departure and scheduled_departure:
-                    delay_minutes = int((actual_departure - scheduled_departure).total_seconds() / 60)
-                
-                # 欠航理由
-                cancellation_reason = None
-                if cancelled:
-                    cancellation_reason = flight.get("cancellation_reason", "Weather")
-                
-                # 機材情報
-                aircraft_type = flight.get("aircraft_type", "")
-                
-                flight_data = FlightData(
-                    flight_id=flight_id,
-                    airline=airline,
-                    flight_number=flight_number,
-                    departure_airport=departure_airport,
-                    arrival_airport=arrival_airport,
-                    scheduled_departure=scheduled_departure,
-                    actual_departure=actual_departure,
-                    scheduled_arrival=scheduled_arrival,
-                    actual_arrival=actual_arrival,
-                    status=status,
-                    delay_minutes=delay_minutes,
-                    cancelled=cancelled,
-                    cancellation_reason=cancellation_reason,
-                    aircraft_type=aircraft_type
-                )
-                
-                processed_flights.append(flight_data)
-                
-            except Exception as e:
-                logger.error(f"フライトデータ処理エラー: {e}")
+            # 基本情報取得
+            flight_id = flight.get("fa_flight_id")
+            if not flight_id:
+                skipped += 1
                 continue
+            
+            airline = flight.get("operator", "").split()[0] if flight.get("operator") else ""
+            flight_number = flight.get("flight_number", "")
+            
+            # 空港情報
+            departure_airport = (flight.get("origin") or {}).get("code", "")
+            arrival_airport = (flight.get("destination") or {}).get("code", "")
+            
+            # 時刻情報
+            scheduled_departure = self._parse_datetime(flight.get("scheduled_out"))
+            actual_departure = self._parse_datetime(flight.get("actual_out"))
+            scheduled_arrival = self._parse_datetime(flight.get("scheduled_in"))
+            actual_arrival = self._parse_datetime(flight.get("actual_in"))
+            
+            # ステータス情報
+            status = flight.get("status", "")
+            cancelled = status in ["Cancelled", "Canceled"]
+            
+            # 遅延計算
+            delay_minutes = 0
+            if actual_departure and scheduled_departure:
+                # timedeltaを作らずPOSIX秒の差から算出（0方向への切り捨ては従来通り）
+                delay_minutes = int((actual_departure.timestamp() - scheduled_departure.timestamp()) / 60)
+            
+            # 欠航理由
+            cancellation_reason = None
+            if cancelled:
+                cancellation_reason = flight.get("cancellation_reason", "Weather")
+            
+            # 機材情報
+            aircraft_type = flight.get("aircraft_type", "")
+            
+            flight_data = FlightData(
+                flight_id=flight_id,
+                airline=airline,
+                flight_number=flight_number,
+                departure_airport=departure_airport,
+                arrival_airport=arrival_airport,
+                scheduled_departure=scheduled_departure,
+                actual_departure=actual_departure,
+                scheduled_arrival=scheduled_arrival,
+                actual_arrival=actual_arrival,
+                status=status,
+                delay_minutes=delay_minutes,
+                cancelled=cancelled,
+                cancellation_reason=cancellation_reason,
+                aircraft_type=aircraft_type
+            )
+            
+            processed_flights.append(flight_data)
+        
+        if skipped:
+            logger.warning(f"⚠️ fa_flight_idの無いデータを{skipped}件スキップしました")
         
         return processed_flights
     
-    def _parse_datetime(self, datetime_str: Optional[str]) -> Optional[datetime]:
-        """日時文字列をdatetimeオブジェクトに変換"""
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _parse_datetime(datetime_str: Optional[str]) -> Optional[datetime]:
+        """日時文字列をdatetimeオブジェクトに変換（同じ時刻文字列が多いためキャッシュ）"""
         if not datetime_str:
             return None
         
@@ -304,29 +539,29 @@ class FlightAwareAPI:
     def save_to_csv(self, flights: List[FlightData]) -> str:
         """データをCSVファイルに保存"""
         
-        csv_data = []
-        
-        for flight in flights:
-            csv_data.append({
-                "flight_id": flight.flight_id,
-                "airline": flight.airline,
-                "flight_number": flight.flight_number,
-                "departure_airport": flight.departure_airport,
-                "arrival_airport": flight.arrival_airport,
-                "scheduled_departure": flight.scheduled_departure.isoformat() if flight.scheduled_departure else "",
-                "actual_departure": flight.actual_departure.isoformat() if flight.actual_departure else "",
-                "scheduled_arrival": flight.scheduled_arrival.isoformat() if flight.scheduled_arrival else "",
-                "actual_arrival": flight.actual_arrival.isoformat() if flight.actual_arrival else "",
-                "status": flight.status,
-                "delay_minutes": flight.delay_minutes,
-                "cancelled": flight.cancelled,
-                "cancellation_reason": flight.cancellation_reason or "",
-                "aircraft_type": flight.aircraft_type or ""
-            })
-        
-        # CSV出力
-        df = pd.DataFrame(csv_data)
-        df.to_csv(self.flight_data_file, index=False, encoding='utf-8')
+        # CSV出力（中間のdictやDataFrameを作らず1行ずつ書き出す）
+        with open(self.flight_data_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(FLIGHT_CSV_FIELDS)
+            writer.writerows(
+                (
+                    flight.flight_id,
+                    flight.airline,
+                    flight.flight_number,
+                    flight.departure_airport,
+                    flight.arrival_airport,
+                    flight.scheduled_departure.isoformat() if flight.scheduled_departure else "",
+                    flight.actual_departure.isoformat() if flight.actual_departure else "",
+                    flight.scheduled_arrival.isoformat() if flight.scheduled_arrival else "",
+                    flight.actual_arrival.isoformat() if flight.actual_arrival else "",
+                    flight.status,
+                    flight.delay_minutes,
+                    flight.cancelled,
+                    flight.cancellation_reason or "",
+                    flight.aircraft_type or ""
+                )
+                for flight in flights
+            )
         
         logger.info(f"📁 データを保存しました: {self.flight_data_file}")
         return str(self.flight_data_file)
@@ -337,45 +572,102 @@ class FlightAwareAPI:
         if not flights:
             return {"error": "分析対象データがありません"}
         
-        # 基本統計
-        total_flights = len(flights)
-        cancelled_flights = len([f for f in flights if f.cancelled])
-        delayed_flights = len([f for f in flights if f.delay_minutes > 15])
+        if len(flights) >= FRAME_ANALYSIS_MIN_FLIGHTS:
+            return self._analyze_flight_frame(self._flights_to_frame(flights))
         
-        cancellation_rate = (cancelled_flights / total_flights * 100) if total_flights > 0 else 0
-        delay_rate = (delayed_flights / total_flights * 100) if total_flights > 0 else 0
+        # 1回の走査で全ての集計を更新する（[総数, 欠航, 遅延]）
+        airline_counts = defaultdict(lambda: [0, 0, 0])
+        route_counts = defaultdict(lambda: [0, 0, 0])
+        cancellation_reasons = Counter()
+        cancelled_flights = delayed_flights = complete_records = missing_actual_times = 0
         
-        # 航空会社別分析
-        airlines = {}
         for flight in flights:
-            if flight.airline not in airlines:
-                airlines[flight.airline] = {"total": 0, "cancelled": 0, "delayed": 0}
+            cancelled = flight.cancelled
+            delayed = flight.delay_minutes > 15
             
-            airlines[flight.airline]["total"] += 1
-            if flight.cancelled:
-                airlines[flight.airline]["cancelled"] += 1
-            if flight.delay_minutes > 15:
-                airlines[flight.airline]["delayed"] += 1
-        
-        # 路線別分析
-        routes = {}
-        for flight in flights:
-            route = f"{flight.departure_airport}-{flight.arrival_airport}"
-            if route not in routes:
-                routes[route] = {"total": 0, "cancelled": 0, "delayed": 0}
+            cancelled_flights += cancelled
+            delayed_flights += delayed
             
-            routes[route]["total"] += 1
-            if flight.cancelled:
-                routes[route]["cancelled"] += 1
-            if flight.delay_minutes > 15:
-                routes[route]["delayed"] += 1
-        
-        # 欠航理由分析
-        cancellation_reasons = {}
-        for flight in flights:
-            if flight.cancelled and flight.cancellation_reason:
-                reason = flight.cancellation_reason
-                cancellation_reasons[reason] = cancellation_reasons.get(reason, 0) + 1
+            # 航空会社別・路線別
+            for counts in (airline_counts[flight.airline],
+                           route_counts[f"{flight.departure_airport}-{flight.arrival_airport}"]):
+                counts[0] += 1
+                counts[1] += cancelled
+                counts[2] += delayed
+            
+            # 欠航理由
+            if cancelled and flight.cancellation_reason:
+                cancellation_reasons[flight.cancellation_reason] += 1
+            
+            # データ品質
+            if flight.scheduled_departure and flight.departure_airport:
+                complete_records += 1
+            if not flight.actual_departure and not cancelled:
+                missing_actual_times += 1
+        
+        total_flights = len(flights)
+        cancellation_rate = (cancelled_flights / total_flights * 100) if total_flights > 0 else 0
+        delay_rate = (delayed_flights / total_flights * 100) if total_flights > 0 else 0
+        
+        def as_dicts(counts: Dict[str, List[int]]) -> Dict[str, Dict[str, int]]:
+            return {
+                key: {"total": total, "cancelled": cancelled, "delayed": delayed}
+                for key, (total, cancelled, delayed) in counts.items()
+            }
+        
+        return {
+            "period_summary": {
+                "total_flights": total_flights,
+                "cancelled_flights": cancelled_flights,
+                "delayed_flights": delayed_flights,
+                "cancellation_rate": round(cancellation_rate, 2),
+                "delay_rate": round(delay_rate, 2)
+            },
+            "airline_analysis": as_dicts(airline_counts),
+            "route_analysis": as_dicts(route_counts),
+            "cancellation_reasons": dict(cancellation_reasons),
+            "data_quality": {
+                "complete_records": complete_records,
+                "missing_actual_times": missing_actual_times
+            }
+        }
+    
+    def _flights_to_frame(self, flights: List[FlightData]) -> "pd.DataFrame":
+        """分析に必要な列だけのDataFrameを作成"""
+        
+        # 大量データの分析時だけ必要なため、起動時ではなくここでimportする
+        import pandas as pd
+        
+        return pd.DataFrame({
+            "airline": [f.airline for f in flights],
+            "route": [f"{f.departure_airport}-{f.arrival_airport}" for f in flights],
+            "cancelled": [f.cancelled for f in flights],
+            "delay_minutes": [f.delay_minutes for f in flights],
+            "cancellation_reason": [f.cancellation_reason for f in flights],
+            "complete": [bool(f.scheduled_departure and f.departure_airport) for f in flights],
+            "has_actual_departure": [f.actual_departure is not None for f in flights]
+        })
+    
+    def _analyze_flight_frame(self, df: "pd.DataFrame") -> Dict:
+        """analyze_flight_dataのDataFrame版（groupbyで集計）"""
+        
+        df["delayed"] = df.delay_minutes > 15
+        
+        total_flights = len(df)
+        cancelled_flights = int(df.cancelled.sum())
+        delayed_flights = int(df.delayed.sum())
+        
+        cancellation_rate = (cancelled_flights / total_flights * 100) if total_flights > 0 else 0
+        delay_rate = (delayed_flights / total_flights * 100) if total_flights > 0 else 0
+        
+        def group_counts(key: str) -> Dict[str, Dict[str, int]]:
+            return df.groupby(key, sort=False).agg(
+                total=("cancelled", "size"),
+                cancelled=("cancelled", "sum"),
+                delayed=("delayed", "sum")
+            ).to_dict("index")
+        
+        reasons = df.loc[df.cancelled & df.cancellation_reason.fillna("").astype(bool), "cancellation_reason"]
         
         return {
             "period_summary": {
@@ -385,12 +677,12 @@ class FlightAwareAPI:
                 "cancellation_rate": round(cancellation_rate, 2),
                 "delay_rate": round(delay_rate, 2)
             },
-            "airline_analysis": airlines,
-            "route_analysis": routes,
-            "cancellation_reasons": cancellation_reasons,
+            "airline_analysis": group_counts("airline"),
+            "route_analysis": group_counts("route"),
+            "cancellation_reasons": reasons.value_counts(sort=False).to_dict(),
             "data_quality": {
-                "complete_records": len([f for f in flights if f.scheduled_departure and f.departure_airport]),
-                "missing_actual_times": len([f for f in flights if not f.actual_departure and not f.cancelled])
+                "complete_records": int(df.complete.sum()),
+                "missing_actual_times": int((~df.has_actual_departure & ~df.cancelled).sum())
             }
         }
     
@@ -8,18 +8,35 @@
 """
 
 import json
-import random
 from datetime import datetime, timedelta, date
 from pathlib import Path
 import pandas as pd
+import numpy as np
+
+# JSON出力は可能ならorjsonを使う
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 class ForecastDataGenerator:
     """7日間運航予報データ生成クラス"""
     
-    def __init__(self):
+    # リスクレベル判定（np.digitizeの区間番号で引く）
+    _RISK_THRESHOLDS = (20, 40, 60)
+    _RISK_LEVELS = ("Low", "Medium", "High", "Critical")
+    _RISK_COLORS = ("success", "info", "warning", "danger")
+    
+    # 曜日表示（date.weekday()の値で引く）
+    _WEEKDAYS = ("月", "火", "水", "木", "金", "土", "日")
+    
+    def __init__(self, seed=None):
         self.data_dir = Path(__file__).parent / "data"
         self.data_dir.mkdir(exist_ok=True)
         
+        # 気象予報の乱数生成器（インスタンス専用、seed指定で再現可能）
+        self._rng = np.random.default_rng(seed)
+        
         # ハートランドフェリー実際の時刻表（2025年度）1日18便
         self.ferry_schedules = {
             # 稚内⇔鴛泊（利尻島） 往復6便
@@ -85,6 +102,22 @@ class ForecastDataGenerator:
             "wakkanai_kutsugata": "稚内→沓形",
             "kutsugata_wakkanai": "沓形→稚内"
         }
+        
+        # 1日分の全便を表示用の値込みで平坦化（予報生成時に辞書を引き直さない）
+        self._flat_services = [
+            (
+                route_id,
+                self.route_display_names[route_id],
+                self.port_names[route_id]['departure'],
+                self.port_names[route_id]['arrival'],
+                service['departure'],
+                service['arrival'],
+                service['service_no'],
+                service['vessel']
+            )
+            for route_id, schedule in self.ferry_schedules.items()
+            for service in schedule
+        ]
     
     def generate_weather_forecast(self, days_ahead=0):
         """気象予報生成（予報日数に応じた精度調整）"""
@@ -97,25 +130,52 @@ class ForecastDataGenerator:
         
         if is_winter:
             # 冬季：厳しい条件多め
-            wind_speed = random.uniform(5, 28) * accuracy_factor
-            wave_height = random.uniform(1.0, 5.5) * accuracy_factor
-            visibility = random.uniform(0.5, 10.0)
-            temperature = random.uniform(-18, 8)
+            wind_speed = self._rng.uniform(5, 28) * accuracy_factor
+            wave_height = self._rng.uniform(1.0, 5.5) * accuracy_factor
+            visibility = self._rng.uniform(0.5, 10.0)
+            temperature = self._rng.uniform(-18, 8)
         else:
             # 夏季：比較的穏やか
-            wind_speed = random.uniform(3, 22) * accuracy_factor
-            wave_height = random.uniform(0.5, 4.5) * accuracy_factor
-            visibility = random.uniform(1.0, 15.0)
-            temperature = random.uniform(8, 28)
+            wind_speed = self._rng.uniform(3, 22) * accuracy_factor
+            wave_height = self._rng.uniform(0.5, 4.5) * accuracy_factor
+            visibility = self._rng.uniform(1.0, 15.0)
+            temperature = self._rng.uniform(8, 28)
         
         return {
-            'wind_speed': round(wind_speed, 1),
-            'wave_height': round(wave_height, 1),
-            'visibility': round(visibility, 1),
-            'temperature': round(temperature, 1),
+            'wind_speed': round(float(wind_speed), 1),
+            'wave_height': round(float(wave_height), 1),
+            'visibility': round(float(visibility), 1),
+            'temperature': round(float(temperature), 1),
             'forecast_confidence': round(accuracy_factor * 100, 0)
         }
     
+    def generate_weather_forecasts(self, days_ahead):
+        """気象予報の一括生成（便ごとの予報日数の配列に対して各項目を1回で生成）"""
+        n = len(days_ahead)
+        accuracy_factor = np.maximum(0.5, 1.0 - np.asarray(days_ahead) * 0.1)
+        
+        current_month = datetime.now().month
+        is_winter = current_month in [11, 12, 1, 2, 3]
+        
+        if is_winter:
+            wind_speed = self._rng.uniform(5, 28, n) * accuracy_factor
+            wave_height = self._rng.uniform(1.0, 5.5, n) * accuracy_factor
+            visibility = self._rng.uniform(0.5, 10.0, n)
+            temperature = self._rng.uniform(-18, 8, n)
+        else:
+            wind_speed = self._rng.uniform(3, 22, n) * accuracy_factor
+            wave_height = self._rng.uniform(0.5, 4.5, n) * accuracy_factor
+            visibility = self._rng.uniform(1.0, 15.0, n)
+            temperature = self._rng.uniform(8, 28, n)
+        
+        return {
+            'wind_speed': np.round(wind_speed, 1),
+            'wave_height': np.round(wave_height, 1),
+            'visibility': np.round(visibility, 1),
+            'temperature': np.round(temperature, 1),
+            'forecast_confidence': np.round(accuracy_factor * 100, 0)
+        }
+    
     def calculate_cancellation_risk(self, weather, route, days_ahead):
         """欠航リスク計算（高精度）"""
         risk_score = 0
@@ -184,51 +244,121 @@ class ForecastDataGenerator:
             'is_likely_cancelled': risk_score >= 50
         }
     
+    def calculate_cancellation_risks(self, weather, routes, days_ahead):
+        """欠航リスクの一括計算（calculate_cancellation_riskの配列版）"""
+        wind_speed = weather['wind_speed']
+        wave_height = weather['wave_height']
+        visibility = weather['visibility']
+        temperature = weather['temperature']
+        routes = np.asarray(routes, dtype=str)
+        
+        # 基本リスク評価（各条件を真偽値マスクで評価）
+        risk_score = (
+            np.where(wind_speed > 22, 40, np.where(wind_speed > 18, 25, np.where(wind_speed > 15, 10, 0)))
+            + np.where(wave_height > 4.0, 35, np.where(wave_height > 3.0, 20, np.where(wave_height > 2.5, 10, 0)))
+            + np.where(visibility < 1.0, 30, np.where(visibility < 2.0, 15, 0))
+            + np.where(temperature < -10, 20, np.where(temperature < -5, 10, 0))
+        ).astype(float)
+        
+        # 航路別調整
+        is_kafuka_route = np.char.find(routes, "kafuka") >= 0
+        risk_score *= np.where(is_kafuka_route, 1.1, 1.0)
+        is_island_route = (np.char.find(routes, "oshidomari_kafuka") >= 0) | (np.char.find(routes, "kafuka_oshidomari") >= 0)
+        risk_score *= np.where(is_island_route, 0.9, 1.0)
+        
+        # 予報日数による不確実性
+        risk_score += np.asarray(days_ahead) * 3
+        
+        # リスク要因（該当なしは空文字）
+        factor_columns = [
+            np.select([wind_speed > 22, wind_speed > 18], ["強風", "風やや強"], ""),
+            np.select([wave_height > 4.0, wave_height > 3.0], ["高波", "波やや高"], ""),
+            np.select([visibility < 1.0, visibility < 2.0], ["視界不良", "視界やや悪"], ""),
+            np.where(temperature < -10, "低温", "")
+        ]
+        risk_factors = [[factor for factor in row if factor] for row in zip(*(col.tolist() for col in factor_columns))]
+        
+        level_index = np.digitize(risk_score, self._RISK_THRESHOLDS).tolist()
+        
+        # 単体版と同じく、係数のかからない航路とmin/maxで0・100に丸まる値は整数で返す
+        is_int_score = (~is_kafuka_route | (risk_score <= 0) | (risk_score >= 100)).tolist()
+        scores = [
+            int(score) if is_int else score
+            for score, is_int in zip(np.clip(risk_score, 0, 100).tolist(), is_int_score)
+        ]
+        
+        return [
+            {
+                'risk_score': score,
+                'risk_level': self._RISK_LEVELS[index],
+                'risk_color': self._RISK_COLORS[index],
+                'risk_factors': factors,
+                'is_likely_cancelled': likely
+            }
+            for score, index, factors, likely in zip(
+                scores, level_index, risk_factors, (risk_score >= 50).tolist()
+            )
+        ]
+    
     def generate_7day_forecast(self):
         """7日間運航予報生成"""
         forecast_data = {}
         
+        services = self._flat_services
+        
+        # 7日分全便の気象予報を一括生成（日ごとに便数分ずつ並ぶ）
+        days_ahead = np.repeat(np.arange(7), len(services))
+        weather_arrays = self.generate_weather_forecasts(days_ahead)
+        weather_columns = {key: values.tolist() for key, values in weather_arrays.items()}
+        
+        # 全便の欠航リスクも一括計算
+        risk_infos = self.calculate_cancellation_risks(
+            weather_arrays, [service[0] for service in services] * 7, days_ahead
+        )
+        index = 0
+        
         for day in range(7):
             target_date = date.today() + timedelta(days=day)
             date_str = target_date.strftime("%Y-%m-%d")
+            date_display = target_date.strftime("%m月%d日")
+            weekday = self._WEEKDAYS[target_date.weekday()]
             
             daily_forecasts = []
             
-            for route_id, schedule in self.ferry_schedules.items():
-                for service in schedule:
-                    # 気象予報生成
-                    weather = self.generate_weather_forecast(days_ahead=day)
-                    
-                    # 欠航リスク計算
-                    risk_info = self.calculate_cancellation_risk(weather, route_id, day)
-                    
-                    # 便情報
-                    service_info = {
-                        'date': date_str,
-                        'date_display': target_date.strftime("%m月%d日"),
-                        'weekday': ["月", "火", "水", "木", "金", "土", "日"][target_date.weekday()],
-                        'route_id': route_id,
-                        'route_name': self.route_display_names[route_id],
-                        'departure_port': self.port_names[route_id]['departure'],
-                        'arrival_port': self.port_names[route_id]['arrival'],
-                        'departure_time': service['departure'],
-                        'arrival_time': service['arrival'],
-                        'service_no': service['service_no'],
-                        'vessel': service['vessel'],
-                        'weather': weather,
-                        'risk': risk_info,
-                        'forecast_generated_at': datetime.now().isoformat(),
-                        'forecast_confidence': weather['forecast_confidence']
-                    }
-                    
-                    daily_forecasts.append(service_info)
+            for (route_id, route_name, departure_port, arrival_port,
+                 departure_time, arrival_time, service_no, vessel) in services:
+                # 気象予報（一括生成済みの値を取り出す）
+                weather = {key: values[index] for key, values in weather_columns.items()}
+                risk_info = risk_infos[index]
+                index += 1
+                
+                # 便情報
+                service_info = {
+                    'date': date_str,
+                    'date_display': date_display,
+                    'weekday': weekday,
+                    'route_id': route_id,
+                    'route_name': route_name,
+                    'departure_port': departure_port,
+                    'arrival_port': arrival_port,
+                    'departure_time': departure_time,
+                    'arrival_time': arrival_time,
+                    'service_no': service_no,
+                    'vessel': vessel,
+                    'weather': weather,
+                    'risk': risk_info,
+                    'forecast_generated_at': datetime.now().isoformat(),
+                    'forecast_confidence': weather['forecast_confidence']
+                }
+                
+                daily_forecasts.append(service_info)
             
             # 日付別にソート（時刻順）
             daily_forecasts.sort(key=lambda x: x['departure_time'])
             forecast_data[date_str] = {
                 'date': date_str,
-                'date_display': target_date.strftime("%m月%d日"),
-                'weekday': ["月", "火", "水", "木", "金", "土", "日"][target_date.weekday()],
+                'date_display': date_display,
+                'weekday': weekday,
                 'services': daily_forecasts,
                 'total_services': len(daily_forecasts),
                 'high_risk_services': len([s for s in daily_forecasts if s['risk']['risk_level'] in ['High', 'Critical']]),
@@ -241,16 +371,27 @@ class ForecastDataGenerator:
         """予報データをJSONファイルに保存"""
         json_file = self.data_dir / "7day_forecast.json"
         
-        output_data = {
-            'generated_at': datetime.now().isoformat(),
-            'forecast_period': '7_days',
-            'total_days': len(forecast_data),
-            'forecast_data': forecast_data
-        }
+        if orjson is not None:
+            def encode(value):
+                return orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        else:
+            def encode(value):
+                return json.dumps(value, ensure_ascii=False, indent=2)
         
+        # 外枠を書いてから日ごとにエンコードして書き出す（全体を一度にメモリ上に作らない）
+        # 出力はjson.dump(..., indent=2)と同じ整形になる
         with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
-            
+            f.write('{\n')
+            f.write(f'  "generated_at": {encode(datetime.now().isoformat())},\n')
+            f.write('  "forecast_period": "7_days",\n')
+            f.write(f'  "total_days": {len(forecast_data)},\n')
+            f.write('  "forecast_data": {')
+            for i, (date_str, day_data) in enumerate(forecast_data.items()):
+                f.write(',\n    ' if i else '\n    ')
+                f.write(f'{encode(date_str)}: ')
+                f.write(encode(day_data).replace('\n', '\n    '))
+            f.write('\n  }\n}' if forecast_data else '}\n}')
+        
         print(f"7-day forecast data saved to: {json_file}")
         return json_file
 
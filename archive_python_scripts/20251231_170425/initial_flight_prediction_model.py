@@ -45,6 +45,49 @@ class FlightPredictionOutput:
     confidence_level: float
     weather_summary: str
 
+@dataclass
+class FlightPredictionBatch:
+    """Flight prediction inputs for many slots (SoA layout, one array entry per slot)"""
+    month: np.ndarray
+    hour: np.ndarray
+    
+    # Weather data
+    temperature: np.ndarray
+    humidity: np.ndarray
+    wind_speed: np.ndarray
+    wind_direction: np.ndarray
+    visibility: np.ndarray
+    pressure: np.ndarray
+    precipitation: np.ndarray
+    
+    # Terrain/location specific
+    sea_temperature_diff: np.ndarray
+    mountain_wave_risk: str  # shared by all slots
+    
+    @classmethod
+    def from_weather_broadcast(cls, month: int, hours: np.ndarray, temperature: float, humidity: float,
+                               wind_speed: float, wind_direction: int, visibility: float, pressure: float,
+                               precipitation: float, sea_temperature_diff: float,
+                               mountain_wave_risk: str) -> "FlightPredictionBatch":
+        """Batch for one weather state shared by every slot; only the hour varies"""
+        n = len(hours)
+        return cls(
+            month=np.full(n, month),
+            hour=hours,
+            temperature=np.tile(temperature, n),
+            humidity=np.tile(humidity, n),
+            wind_speed=np.tile(wind_speed, n),
+            wind_direction=np.tile(wind_direction, n),
+            visibility=np.tile(visibility, n),
+            pressure=np.tile(pressure, n),
+            precipitation=np.tile(precipitation, n),
+            sea_temperature_diff=np.tile(sea_temperature_diff, n),
+            mountain_wave_risk=mountain_wave_risk
+        )
+
+# Primary risk factor names, in tie-break order of calculate_overall_prediction
+PRIMARY_RISK_FACTORS = ("Sea Fog", "Frontal Weather", "Mountain Wave/Karman Vortex")
+
 class InitialFlightPredictor:
     """Initial flight cancellation prediction model"""
     
@@ -278,6 +321,66 @@ class InitialFlightPredictor:
             weather_summary=weather_summary
         )
     
+    def calculate_overall_prediction_batch(self, batch: FlightPredictionBatch) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized calculate_overall_prediction over all slots of a batch
+        
+        Returns (cancellation_probability, primary_risk_factor) arrays.
+        """
+        
+        fog = self.summer_patterns["sea_fog"]
+        fog_cond = fog["conditions"]
+        front_cond = self.summer_patterns["autumn_front"]["conditions"]
+        karman = self.karman_vortex_model
+        thresholds = karman["wind_speed_thresholds"]
+        
+        ws = batch.wind_speed
+        vis = batch.visibility
+        precip = batch.precipitation
+        
+        # Sea fog risk
+        fog_risk = np.minimum(
+            np.where(np.isin(batch.hour, fog["peak_hours"]), 0.3, 0.0)
+            + np.where(batch.humidity >= fog_cond["humidity_threshold"], 0.25, 0.0)
+            + np.where(ws <= fog_cond["wind_speed_max"], 0.2, 0.0)
+            + np.where(batch.sea_temperature_diff >= fog_cond["temp_diff_min"], 0.15, 0.0)
+            + np.where(vis <= fog_cond["visibility_threshold"], 0.4, 0.0),
+            0.9
+        )
+        
+        # Frontal weather risk
+        frontal_risk = np.minimum(
+            np.where(ws >= front_cond["wind_speed_min"], 0.3, 0.0)
+            + np.where(precip >= front_cond["precipitation_min"], 0.35, 0.0)
+            + np.where(batch.pressure < 1010, 0.2, 0.0)
+            + np.where((precip > 0) & (vis < 5000), 0.25, 0.0),
+            0.9
+        )
+        
+        # Karman vortex risk (terrain amplification applies to any non-zero score)
+        karman_risk = np.where(
+            np.isin(batch.wind_direction, karman["critical_wind_directions"]),
+            np.select(
+                [ws >= thresholds["critical"], ws >= thresholds["high"],
+                 ws >= thresholds["medium"], ws >= thresholds["low"]],
+                [0.5, 0.35, 0.2, 0.1],
+                0.0
+            ),
+            0.0
+        )
+        karman_risk = np.minimum(karman_risk * karman["terrain_roughness"], 0.8)
+        
+        # argmax keeps the first maximum, matching the stable sort of the scalar path
+        risks = np.stack([fog_risk, frontal_risk, karman_risk])
+        primary_risk_factor = np.asarray(PRIMARY_RISK_FACTORS)[np.argmax(risks, axis=0)]
+        
+        combined_prob = 1.0 - np.prod(1.0 - risks, axis=0)
+        seasonal_factor = np.select(
+            [np.isin(batch.month, [6, 7, 8]), batch.month == 9], [1.1, 1.05], 1.0
+        )
+        cancellation_probability = np.minimum(combined_prob * seasonal_factor, 0.95)
+        
+        return cancellation_probability, primary_risk_factor
+    
     def validate_september_1_case(self) -> Dict:
         """Validate model against September 1, 2025 cancellation case"""
         
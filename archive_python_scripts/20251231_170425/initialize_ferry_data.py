@@ -5,20 +5,119 @@ Initialize Ferry Database with Sample Data
 Create initial ferry data for system testing
 """
 
+import os
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from itertools import chain
 from datetime import datetime, timedelta
-import random
+import numpy as np
+from utils_numba import sample_status
 
 class FerryDataInitializer:
     """Initialize ferry data with realistic sample data"""
     
-    def __init__(self):
+    # WAL with synchronous=NORMAL stays consistent on crash while avoiding an fsync per commit
+    CONNECTION_PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-64000",
+    )
+    
+    FERRY_ROUTES = (
+        {"route": "Wakkanai-Rishiri", "times": ("08:00", "13:30", "17:15")},
+        {"route": "Rishiri-Wakkanai", "times": ("09:45", "15:15", "19:00")},
+        {"route": "Wakkanai-Rebun", "times": ("08:30", "14:00", "16:45")},
+        {"route": "Rebun-Wakkanai", "times": ("10:15", "15:45", "18:30")},
+        {"route": "Rishiri-Rebun", "times": ("10:00", "15:30")},
+        {"route": "Rebun-Rishiri", "times": ("11:30", "16:15")},
+    )
+    
+    # Every (route, departure time) slot of a day, in insert order
+    DEPARTURE_SLOTS = tuple(
+        (route_info["route"], departure_time)
+        for route_info in FERRY_ROUTES
+        for departure_time in route_info["times"]
+    )
+    
+    # Offset of each slot's "HH:MM" from midnight, parsed once
+    SLOT_OFFSETS = np.array(
+        [60 * int(departure_time[:2]) + int(departure_time[3:]) for _, departure_time in DEPARTURE_SLOTS],
+        dtype='timedelta64[m]'
+    )
+    
+    WEATHER_CONDITIONS = (
+        "Clear", "Partly Cloudy", "Cloudy", "Light Rain", 
+        "Rain", "Strong Wind", "Fog", "Snow"
+    )
+    
+    # (wind_low, wind_high, wave_low, wave_high) per weather condition
+    WEATHER_RANGES = {
+        "Strong Wind": (20, 35, 2.5, 4.0),
+        "Rain": (10, 20, 1.5, 2.5),
+        "Snow": (10, 20, 1.5, 2.5),
+        "Fog": (5, 15, 0.5, 1.5),
+    }
+    DEFAULT_WEATHER_RANGE = (3, 12, 0.3, 1.8)
+    
+    # Range table indexed by condition ordinal, and the prior used to draw conditions
+    WEATHER_RANGE_TABLE = np.array(list(map(
+        WEATHER_RANGES.get, WEATHER_CONDITIONS, (DEFAULT_WEATHER_RANGE,) * len(WEATHER_CONDITIONS)
+    )))
+    WEATHER_PRIOR = (1 / len(WEATHER_CONDITIONS),) * len(WEATHER_CONDITIONS)
+    
+    # (status, cancelled, delayed) looked up by status index
+    STATUS_OUTCOMES = (("Cancelled", 1, 0), ("Delayed", 0, 1), ("On Schedule", 0, 0))
+    
+    # Risk category implied by the weather condition alone (0=high, 1=medium, 2=fog, 3=good)
+    CONDITION_CATEGORY = {"Strong Wind": 0, "Rain": 1, "Snow": 1, "Fog": 2}
+    CONDITION_CATEGORIES = tuple(
+        map(CONDITION_CATEGORY.get, WEATHER_CONDITIONS, (3,) * len(WEATHER_CONDITIONS))
+    )
+    
+    # Cumulative (cancel, cancel + delay) rates per risk category
+    STATUS_THRESHOLDS = (
+        (0.8, 1.0),    # High: 80% cancellation, otherwise delayed
+        (0.2, 0.5),    # Medium: 20% cancellation, 30% delay
+        (0.1, 0.3),    # Fog: 10% cancellation, 20% delay
+        (0.02, 0.08),  # Good: 2% random cancellation, 6% random delay
+    )
+    
+    # Rows per multi-row INSERT; 40 rows x 12 columns stays under SQLITE_MAX_VARIABLE_NUMBER (999)
+    INSERT_BATCH_ROWS = 40
+    
+    # Build rows in worker processes from this many days on (years of ML training data)
+    PARALLEL_MIN_DAYS = 3650
+    
+    def __init__(self, seed=None):
         self.db_file = "ferry_forecast_data.db"
+        self.conn = None
+        
+        # Sample data RNG (per instance, reproducible when seeded)
+        self._rng = np.random.default_rng(seed)
+    
+    def _connect(self, **kwargs):
+        """Open a tuned connection to the ferry database"""
+        conn = sqlite3.connect(self.db_file, **kwargs)
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _open(self):
+        """Open the connection shared by all initialization phases"""
+        # Transactions are driven explicitly, so run in autocommit mode
+        self.conn = self._connect(isolation_level=None)
+    
+    def _close(self):
+        """Close the shared connection"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
         
     def init_database(self):
         """Initialize ferry database"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         # Drop existing table to recreate with correct schema
         cursor.execute('DROP TABLE IF EXISTS ferry_data')
@@ -41,6 +140,11 @@ class FerryDataInitializer:
             )
         ''')
         
+        # Covering indexes for the per-route / per-weather aggregates in analyze_generated_data
+        cursor.execute('CREATE INDEX idx_ferry_route ON ferry_data(route, cancelled, delayed)')
+        cursor.execute('CREATE INDEX idx_ferry_weather ON ferry_data(weather_condition, cancelled)')
+        cursor.execute('CREATE INDEX idx_ferry_ts ON ferry_data(timestamp)')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS collection_status (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -51,8 +155,6 @@ class FerryDataInitializer:
             )
         ''')
         
-        conn.commit()
-        conn.close()
         print("[OK] Ferry database initialized")
     
     def generate_sample_data(self, days_back=30):
@@ -60,90 +162,51 @@ class FerryDataInitializer:
         
         print(f"[INFO] Generating {days_back} days of sample ferry data...")
         
-        ferry_routes = [
-            {"route": "Wakkanai-Rishiri", "times": ["08:00", "13:30", "17:15"]},
-            {"route": "Rishiri-Wakkanai", "times": ["09:45", "15:15", "19:00"]},
-            {"route": "Wakkanai-Rebun", "times": ["08:30", "14:00", "16:45"]},
-            {"route": "Rebun-Wakkanai", "times": ["10:15", "15:45", "18:30"]},
-            {"route": "Rishiri-Rebun", "times": ["10:00", "15:30"]},
-            {"route": "Rebun-Rishiri", "times": ["11:30", "16:15"]},
-        ]
-        
-        weather_conditions = [
-            "Clear", "Partly Cloudy", "Cloudy", "Light Rain", 
-            "Rain", "Strong Wind", "Fog", "Snow"
-        ]
-        
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        records_created = 0
-        base_date = datetime.now() - timedelta(days=days_back)
-        
-        for day in range(days_back):
-            current_date = base_date + timedelta(days=day)
-            
-            # Generate weather conditions for the day
-            weather_condition = random.choice(weather_conditions)
-            
-            # Weather parameters based on condition
-            if weather_condition == "Strong Wind":
-                wind_speed = random.uniform(20, 35)
-                wave_height = random.uniform(2.5, 4.0)
-            elif weather_condition in ["Rain", "Snow"]:
-                wind_speed = random.uniform(10, 20)
-                wave_height = random.uniform(1.5, 2.5)
-            elif weather_condition == "Fog":
-                wind_speed = random.uniform(5, 15)
-                wave_height = random.uniform(0.5, 1.5)
-            else:
-                wind_speed = random.uniform(3, 12)
-                wave_height = random.uniform(0.3, 1.8)
-            
-            temperature = random.uniform(5, 25)
-            humidity = random.uniform(60, 90)
-            
-            # Process each route
-            for route_info in ferry_routes:
-                route = route_info["route"]
-                
-                for departure_time in route_info["times"]:
-                    # Determine status based on weather
-                    status, cancelled, delayed = self.determine_status(
-                        weather_condition, wind_speed, wave_height
-                    )
-                    
-                    # Create timestamp for this departure
-                    hour, minute = map(int, departure_time.split(':'))
-                    departure_datetime = current_date.replace(
-                        hour=hour, minute=minute, second=0, microsecond=0
-                    )
-                    
-                    cursor.execute('''
-                        INSERT INTO ferry_data 
-                        (timestamp, route, departure_time, status, weather_condition,
-                         wind_speed, wave_height, temperature, humidity, cancelled, delayed, collection_date)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        departure_datetime.isoformat(),
-                        route,
-                        departure_time,
-                        status,
-                        weather_condition,
-                        round(wind_speed, 1),
-                        round(wave_height, 1),
-                        round(temperature, 1),
-                        round(humidity, 1),
-                        cancelled,
-                        delayed,
-                        current_date.date().isoformat()
-                    ))
-                    
-                    records_created += 1
-        
-        conn.commit()
-        conn.close()
-        
+        base_date = np.datetime64(datetime.now().date() - timedelta(days=days_back), 'D')
+        
+        if days_back >= self.PARALLEL_MIN_DAYS:
+            # Split the days into one block per core, each with its own RNG seed
+            workers = os.cpu_count() or 1
+            block = -(-days_back // workers)
+            seeds = self._rng.integers(np.iinfo(np.int64).max, size=workers).tolist()
+            blocks = [
+                (base_date + start, min(block, days_back - start), seed)
+                for start, seed in zip(range(0, days_back, block), seeds)
+            ]
+            with ProcessPoolExecutor(max_workers=len(blocks)) as executor:
+                rows = list(chain.from_iterable(executor.map(_build_rows_block, blocks)))
+        else:
+            rows = self._build_rows(base_date, days_back)
+        
+        # Load everything in one transaction so the whole load commits once,
+        # INSERT_BATCH_ROWS rows per multi-row VALUES statement
+        insert_sql = '''
+            INSERT INTO ferry_data 
+            (timestamp, route, departure_time, status, weather_condition,
+             wind_speed, wave_height, temperature, humidity, cancelled, delayed, collection_date)
+            VALUES '''
+        placeholders = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        batch = self.INSERT_BATCH_ROWS
+        full_batch_sql = insert_sql + ", ".join([placeholders] * batch)
+        
+        cursor = self.conn.cursor()
+        
+        # Single writer: take the write lock up front and hold it for the whole load
+        cursor.execute('PRAGMA locking_mode=EXCLUSIVE')
+        cursor.execute('BEGIN IMMEDIATE')
+        for start in range(0, len(rows), batch):
+            chunk = rows[start:start + batch]
+            sql = full_batch_sql if len(chunk) == batch else insert_sql + ", ".join([placeholders] * len(chunk))
+            cursor.execute(sql, tuple(chain.from_iterable(chunk)))
+        cursor.execute('COMMIT')
+        
+        # Back to shared locking; the lock is released on the next database access
+        cursor.execute('PRAGMA locking_mode=NORMAL')
+        
+        # Refresh planner statistics so the covering indexes are picked up
+        cursor.execute('ANALYZE')
+        
+        records_created = len(rows)
         print(f"[OK] Created {records_created} ferry records")
         
         # Log the initialization
@@ -151,104 +214,122 @@ class FerryDataInitializer:
         
         return records_created
     
-    def determine_status(self, weather_condition, wind_speed, wave_height):
-        """Determine ferry status based on conditions"""
-        
-        # High probability cancellation conditions
-        if weather_condition == "Strong Wind" or wind_speed > 25 or wave_height > 3.0:
-            if random.random() < 0.8:  # 80% cancellation rate
-                return "Cancelled", 1, 0
-            else:
-                return "Delayed", 0, 1
-        
-        # Medium risk conditions
-        elif weather_condition in ["Rain", "Snow"] or wind_speed > 15 or wave_height > 2.0:
-            rand = random.random()
-            if rand < 0.2:  # 20% cancellation
-                return "Cancelled", 1, 0
-            elif rand < 0.5:  # 30% delay
-                return "Delayed", 0, 1
-            else:
-                return "On Schedule", 0, 0
-        
-        # Fog conditions (visibility issues)
-        elif weather_condition == "Fog":
-            rand = random.random()
-            if rand < 0.1:  # 10% cancellation
-                return "Cancelled", 1, 0
-            elif rand < 0.3:  # 20% delay
-                return "Delayed", 0, 1
-            else:
-                return "On Schedule", 0, 0
-        
-        # Good conditions
-        else:
-            rand = random.random()
-            if rand < 0.02:  # 2% random cancellation
-                return "Cancelled", 1, 0
-            elif rand < 0.08:  # 6% random delay
-                return "Delayed", 0, 1
-            else:
-                return "On Schedule", 0, 0
+    def _build_rows(self, first_day, days):
+        """Build sample insert rows for `days` consecutive days starting at first_day"""
+        
+        # Draw every day's weather in one batch; ranges are looked up per condition
+        rng = self._rng
+        cond_idx = rng.choice(len(self.WEATHER_CONDITIONS), size=days, p=self.WEATHER_PRIOR)
+        ranges = self.WEATHER_RANGE_TABLE[cond_idx]
+        
+        wind_speeds = rng.uniform(ranges[:, 0], ranges[:, 1])
+        wave_heights = rng.uniform(ranges[:, 2], ranges[:, 3])
+        temperatures = rng.uniform(5, 25, days)
+        humidities = rng.uniform(60, 90, days)
+        
+        slots = self.DEPARTURE_SLOTS
+        
+        # Determine status based on weather for every departure at once
+        status_idx = self.determine_status(cond_idx, wind_speeds, wave_heights, len(slots))
+        
+        # Materialize all departure timestamps as midnight of each day plus the slot offsets
+        dates = first_day + np.arange(days)
+        timestamps = np.datetime_as_string(dates[:, None] + self.SLOT_OFFSETS[None, :], unit='s')
+        collection_dates = np.datetime_as_string(dates)
+        
+        rows = []
+        for cond, wind_speed, wave_height, temperature, humidity, day_status, day_timestamps, collection_date in zip(
+            cond_idx.tolist(), wind_speeds.tolist(), wave_heights.tolist(),
+            temperatures.tolist(), humidities.tolist(), status_idx.tolist(),
+            timestamps.tolist(), collection_dates.tolist()
+        ):
+            # Weather fields are shared by every departure of the day
+            weather_fields = (
+                self.WEATHER_CONDITIONS[cond],
+                round(wind_speed, 1),
+                round(wave_height, 1),
+                round(temperature, 1),
+                round(humidity, 1),
+            )
+            
+            for (route, departure_time), status_i, timestamp in zip(slots, day_status, day_timestamps):
+                status, cancelled, delayed = self.STATUS_OUTCOMES[status_i]
+                
+                rows.append((
+                    timestamp,
+                    route,
+                    departure_time,
+                    status,
+                    *weather_fields,
+                    cancelled,
+                    delayed,
+                    collection_date
+                ))
+        
+        return rows
+    
+    def determine_status(self, cond_idx, wind_speeds, wave_heights, departures):
+        """Determine ferry status indices (into STATUS_OUTCOMES) for every departure"""
+        
+        # Risk category per day: looked up from the condition, then raised by wind/waves
+        category = np.minimum(
+            np.array(self.CONDITION_CATEGORIES)[cond_idx],
+            np.select(
+                [(wind_speeds > 25) | (wave_heights > 3.0), (wind_speeds > 15) | (wave_heights > 2.0)],
+                [0, 1],
+                default=3,
+            ),
+        )
+        
+        # One uniform draw per departure, compared against the category's cumulative rates
+        draws = self._rng.random((len(category), departures))
+        return sample_status(category, draws, np.array(self.STATUS_THRESHOLDS))
     
     def log_initialization(self, records):
         """Log initialization status"""
         
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         cursor.execute('''
             INSERT INTO collection_status (timestamp, total_records, success, error_message)
             VALUES (?, ?, ?, ?)
         ''', (datetime.now().isoformat(), records, 1, "Initial data generation"))
-        
-        conn.commit()
-        conn.close()
     
     def analyze_generated_data(self):
         """Analyze the generated ferry data"""
         
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        # Total records
-        cursor.execute("SELECT COUNT(*) FROM ferry_data")
-        total_records = cursor.fetchone()[0]
-        
-        # Cancelled ferries
-        cursor.execute("SELECT COUNT(*) FROM ferry_data WHERE cancelled = 1")
-        cancelled_count = cursor.fetchone()[0]
-        
-        # Delayed ferries
-        cursor.execute("SELECT COUNT(*) FROM ferry_data WHERE delayed = 1")
-        delayed_count = cursor.fetchone()[0]
-        
-        # Collection days
-        cursor.execute("SELECT COUNT(DISTINCT DATE(timestamp)) FROM ferry_data")
-        collection_days = cursor.fetchone()[0]
-        
-        # Route analysis
-        cursor.execute("""
-            SELECT route, COUNT(*) as total, 
-                   SUM(cancelled) as cancelled,
-                   SUM(delayed) as delayed
-            FROM ferry_data 
-            GROUP BY route 
-            ORDER BY total DESC
-        """)
-        route_stats = cursor.fetchall()
-        
-        # Weather condition analysis
-        cursor.execute("""
-            SELECT weather_condition, COUNT(*) as total,
-                   SUM(cancelled) as cancelled
-            FROM ferry_data 
-            GROUP BY weather_condition 
-            ORDER BY cancelled DESC
-        """)
-        weather_stats = cursor.fetchall()
-        
-        conn.close()
+        # All queries run up front; the cursor is released before reporting
+        with closing(self.conn.cursor()) as cursor:
+            # Totals, cancelled/delayed ferries and collection days in a single scan
+            cursor.execute("""
+                SELECT COUNT(*),
+                       COALESCE(SUM(cancelled = 1), 0),
+                       COALESCE(SUM(delayed = 1), 0),
+                       COUNT(DISTINCT DATE(timestamp))
+                FROM ferry_data
+            """)
+            total_records, cancelled_count, delayed_count, collection_days = cursor.fetchone()
+            
+            # Route analysis
+            cursor.execute("""
+                SELECT route, COUNT(*) as total, 
+                       SUM(cancelled) as cancelled,
+                       SUM(delayed) as delayed
+                FROM ferry_data 
+                GROUP BY route 
+                ORDER BY total DESC
+            """)
+            route_stats = cursor.fetchall()
+            
+            # Weather condition analysis
+            cursor.execute("""
+                SELECT weather_condition, COUNT(*) as total,
+                       SUM(cancelled) as cancelled
+                FROM ferry_data 
+                GROUP BY weather_condition 
+                ORDER BY cancelled DESC
+            """)
+            weather_stats = cursor.fetchall()
         
         cancellation_rate = (cancelled_count / total_records * 100) if total_records > 0 else 0
         delay_rate = (delayed_count / total_records * 100) if total_records > 0 else 0
@@ -300,22 +381,31 @@ class FerryDataInitializer:
         print("FERRY DATABASE INITIALIZATION")
         print("=" * 60)
         
-        # Initialize database
-        self.init_database()
-        
-        # Generate sample data
-        records_created = self.generate_sample_data(days)
-        
-        if records_created > 0:
-            print(f"[SUCCESS] Created {records_created} ferry records")
+        self._open()
+        try:
+            # Initialize database
+            self.init_database()
             
-            # Analyze generated data
-            results = self.analyze_generated_data()
+            # Generate sample data
+            records_created = self.generate_sample_data(days)
             
-            return results
-        else:
-            print("[ERROR] No ferry data created")
-            return None
+            if records_created > 0:
+                print(f"[SUCCESS] Created {records_created} ferry records")
+                
+                # Analyze generated data
+                results = self.analyze_generated_data()
+                
+                return results
+            else:
+                print("[ERROR] No ferry data created")
+                return None
+        finally:
+            self._close()
+
+def _build_rows_block(block):
+    """Worker entry point: build the sample rows for one (first_day, days, seed) block"""
+    first_day, days, seed = block
+    return FerryDataInitializer(seed)._build_rows(first_day, days)
 
 def main():
     """Main execution"""
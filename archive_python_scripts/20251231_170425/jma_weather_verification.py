@@ -6,6 +6,7 @@ Japan Meteorological Agency Historical Weather Analysis
 """
 
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import json
@@ -42,42 +43,45 @@ class JMAWeatherVerification:
             }
         }
     
+    @staticmethod
+    def _probe(url):
+        """Status probe: HEAD, retried as GET when the server does not allow HEAD"""
+        response = requests.head(url, timeout=10, allow_redirects=True)
+        if response.status_code == 405:
+            response = requests.get(url, timeout=10)
+        return response
+    
     def check_jma_historical_access(self):
         """Check JMA historical data access"""
         
         print("=== JMA Historical Data Access Check ===")
         
-        results = {}
-        
-        # Test JMA main historical data site
-        try:
-            url = "https://www.data.jma.go.jp/obd/stats/etrn/index.php"
-            response = requests.get(url, timeout=10)
-            
-            print(f"JMA Historical Data Portal: Status {response.status_code}")
-            results["historical_portal"] = {
-                "accessible": response.status_code == 200,
-                "url": url
-            }
-            
-        except Exception as e:
-            print(f"JMA Historical Data error: {e}")
-            results["historical_portal"] = {"accessible": False, "error": str(e)}
+        # Only the status code matters, so probe with HEAD and check both endpoints concurrently
+        checks = [
+            ("historical_portal", "JMA Historical Data Portal", "JMA Historical Data",
+             "https://www.data.jma.go.jp/obd/stats/etrn/index.php"),
+            ("weather_map", "JMA Weather Map", "JMA Weather Map",
+             "https://www.jma.go.jp/bosai/weather_map/"),
+        ]
         
-        # Test JMA weather map service
-        try:
-            url = "https://www.jma.go.jp/bosai/weather_map/"
-            response = requests.get(url, timeout=10) 
-            
-            print(f"JMA Weather Map: Status {response.status_code}")
-            results["weather_map"] = {
-                "accessible": response.status_code == 200,
-                "url": url
-            }
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+            futures = [executor.submit(self._probe, check[-1]) for check in checks]
             
-        except Exception as e:
-            print(f"JMA Weather Map error: {e}")
-            results["weather_map"] = {"accessible": False, "error": str(e)}
+            # Requests run concurrently, but results are reported in the order of checks
+            for (key, label, error_label, url), future in zip(checks, futures):
+                try:
+                    response = future.result()
+                    
+                    print(f"{label}: Status {response.status_code}")
+                    results[key] = {
+                        "accessible": response.status_code == 200,
+                        "url": url
+                    }
+                    
+                except Exception as e:
+                    print(f"{error_label} error: {e}")
+                    results[key] = {"accessible": False, "error": str(e)}
         
         return results
     
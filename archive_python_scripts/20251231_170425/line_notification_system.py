@@ -11,6 +11,7 @@ LINE Messaging APIを使用してメッセージ・Flex Message・リッチメ
 import asyncio
 import aiohttp
 import json
+from contextlib import suppress
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union
 from pathlib import Path
@@ -21,6 +22,15 @@ import hashlib
 
 logger = logging.getLogger(__name__)
 
+# 一斉送信時のLINE APIへの同時リクエスト数上限
+MAX_CONCURRENT_SENDS = 32
+
+# multicast APIで1リクエストに指定できるユーザーID数の上限
+MULTICAST_MAX_RECIPIENTS = 500
+
+# 通知ログを1回の書き込みでまとめて出力する最大件数
+LOG_FLUSH_MAX_ENTRIES = 500
+
 class LINENotificationSystem:
     """LINE通知システム"""
     
@@ -35,6 +45,13 @@ class LINENotificationSystem:
         # LINE API エンドポイント
         self.line_api_base = "https://api.line.me/v2/bot"
         
+        # LINE API用HTTPセッション（初回送信時に生成し、以降はコネクションを再利用）
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # 通知ログはキュー経由で単一の書き込みタスクがまとめて追記（初回記録時に生成）
+        self._log_queue: Optional[asyncio.Queue] = None
+        self._log_task: Optional[asyncio.Task] = None
+        
         # 通知閾値
         self.notification_thresholds = {
             "high_risk": 70.0,      # 高リスク通知
@@ -62,6 +79,25 @@ class LINENotificationSystem:
             "check": "✅"
         }
         
+        # 予報Flex Messageのリスク色と固定ラベル（絵文字付き）は一度だけ作成
+        self._risk_colors = {
+            "Low": "#00FF00",
+            "Medium": "#FFFF00", 
+            "High": "#FF8000",
+            "Critical": "#FF0000",
+            "Unknown": "#808080"
+        }
+        self._labels = {
+            "route": f"{self.emoji_map['ferry']} 航路",
+            "departure": f"{self.emoji_map['time']} 出発",
+            "risk": f"{self.emoji_map['alert']} リスク",
+            "weather": f"{self.emoji_map['weather']} 気象条件",
+            "wind": f"{self.emoji_map['wind']} 風速",
+            "wave": f"{self.emoji_map['wave']} 波高",
+            "visibility": f"{self.emoji_map['visibility']} 視界",
+            "temperature": f"{self.emoji_map['temperature']} 気温"
+        }
+        
     def _load_config(self) -> Dict:
         """設定読み込み"""
         try:
@@ -120,6 +156,10 @@ class LINENotificationSystem:
         self.config["notification_settings"]["enabled"] = True
         self._save_config(self.config)
         
+        # 生成済みセッションにも新しいトークンを反映
+        if self._session is not None and not self._session.closed:
+            self._session.headers.update(self._get_headers())
+        
         logger.info("LINE Bot設定完了")
     
     def add_notification_target(self, target_id: str, target_type: str = "user"):
@@ -143,8 +183,41 @@ class LINENotificationSystem:
             "Content-Type": "application/json"
         }
     
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """HTTPセッション取得（初回のみ生成）"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=64, keepalive_timeout=75)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers=self._get_headers()
+            )
+        return self._session
+    
+    async def aclose(self):
+        """HTTPセッションのクローズと未書き込み通知ログのフラッシュ"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        
+        if self._log_task is not None and self._log_task.get_loop() is asyncio.get_running_loop():
+            if not self._log_task.done():
+                await self._log_queue.join()
+            self._log_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._log_task
+        self._flush_stale_log_queue()
+        self._log_queue = None
+        self._log_task = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
     async def send_line_message(self, message: Union[Dict, List[Dict]], 
-                               target_id: str = None, target_type: str = "broadcast") -> bool:
+                               target_id: Union[str, List[str]] = None, target_type: str = "broadcast") -> bool:
         """LINEメッセージ送信"""
         try:
             if not self.config["notification_settings"]["enabled"]:
@@ -155,13 +228,22 @@ class LINENotificationSystem:
                 logger.warning("LINE Channel Access Token未設定")
                 return False
             
-            headers = self._get_headers()
-            
             # メッセージペイロード作成
             if target_type == "broadcast":
                 # ブロードキャスト（全友だち）
                 endpoint = f"{self.line_api_base}/message/broadcast"
                 payload = {"messages": message if isinstance(message, list) else [message]}
+            elif target_type == "multicast":
+                # 複数ユーザーへ1リクエストで送信（グループは指定不可）
+                if not target_id:
+                    logger.error("multicast送信にはユーザーIDのリストが必要です")
+                    return False
+                
+                endpoint = f"{self.line_api_base}/message/multicast"
+                payload = {
+                    "to": list(target_id),
+                    "messages": message if isinstance(message, list) else [message]
+                }
             else:
                 # 個別送信
                 if not target_id:
@@ -174,38 +256,55 @@ class LINENotificationSystem:
                     "messages": message if isinstance(message, list) else [message]
                 }
             
-            # LINE API送信
-            async with aiohttp.ClientSession() as session:
-                async with session.post(endpoint, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        logger.info(f"LINE通知送信成功: {target_type}")
-                        self._log_notification(payload, target_type)
-                        return True
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"LINE通知送信失敗: {response.status} - {error_text}")
-                        return False
+            # LINE API送信（認証ヘッダーはセッションに設定済み）
+            session = await self._get_session()
+            async with session.post(endpoint, json=payload) as response:
+                if response.status == 200:
+                    logger.info(f"LINE通知送信成功: {target_type}")
+                    self._log_notification(payload, target_type)
+                    return True
+                else:
+                    error_text = await response.text()
+                    logger.error(f"LINE通知送信失敗: {response.status} - {error_text}")
+                    return False
                         
         except Exception as e:
             logger.error(f"LINE通知送信エラー: {e}")
             return False
     
+    async def _send_multicast(self, message: Union[Dict, List[Dict]], user_ids: List[str]) -> bool:
+        """ユーザーIDのまとまり（最大MULTICAST_MAX_RECIPIENTS件）へmulticast送信"""
+        return await self.send_line_message(message, user_ids[:MULTICAST_MAX_RECIPIENTS], "multicast")
+    
     async def broadcast_to_all_targets(self, message: Union[Dict, List[Dict]]) -> bool:
         """全通知対象に送信"""
-        success_count = 0
-        total_count = 0
+        # ユーザーはmulticastでまとめて、グループはpushで個別に並行送信（同時数はセマフォで制限）
+        user_ids = self.config["user_ids"]
+        group_ids = self.config["group_ids"]
+        user_chunks = [
+            user_ids[i:i + MULTICAST_MAX_RECIPIENTS]
+            for i in range(0, len(user_ids), MULTICAST_MAX_RECIPIENTS)
+        ]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
         
-        # 登録ユーザーに送信
-        for user_id in self.config["user_ids"]:
-            total_count += 1
-            if await self.send_line_message(message, user_id, "push"):
-                success_count += 1
+        async def send_chunk(chunk: List[str]) -> bool:
+            async with semaphore:
+                return await self._send_multicast(message, chunk)
         
-        # 登録グループに送信
-        for group_id in self.config["group_ids"]:
-            total_count += 1
-            if await self.send_line_message(message, group_id, "push"):
-                success_count += 1
+        async def send_group(group_id: str) -> bool:
+            async with semaphore:
+                return await self.send_line_message(message, group_id, "push")
+        
+        results = await asyncio.gather(
+            *(send_chunk(chunk) for chunk in user_chunks),
+            *(send_group(group_id) for group_id in group_ids),
+            return_exceptions=True
+        )
+        
+        # 成功数は送信先単位で数える（multicastはまとまりの件数分）
+        target_counts = [len(chunk) for chunk in user_chunks] + [1] * len(group_ids)
+        success_count = sum(count for count, result in zip(target_counts, results) if result is True)
+        total_count = len(user_ids) + len(group_ids)
         
         logger.info(f"LINE通知結果: {success_count}/{total_count} 成功")
         return success_count > 0
@@ -220,11 +319,61 @@ class LINENotificationSystem:
                 "target_id": payload.get("to", "broadcast")
             }
             
-            with open(self.notification_log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+            # multicastは宛先一覧ではなく件数を記録
+            if isinstance(log_entry["target_id"], list):
+                log_entry["target_count"] = len(log_entry["target_id"])
+                log_entry["target_id"] = "multicast"
+            
+            # イベントループを止めないよう書き込みタスクへ渡すだけにする
+            self._ensure_log_writer()
+            self._log_queue.put_nowait(log_entry)
+        except Exception as e:
+            logger.error(f"通知ログ記録エラー: {e}")
+    
+    def _ensure_log_writer(self):
+        """実行中のイベントループ上に通知ログ書き込みタスクを用意"""
+        loop = asyncio.get_running_loop()
+        if self._log_task is None or self._log_task.done() or self._log_task.get_loop() is not loop:
+            # 以前のループに残ったログは同期的に書き出してから作り直す
+            self._flush_stale_log_queue()
+            self._log_queue = asyncio.Queue()
+            self._log_task = loop.create_task(self._log_writer())
+    
+    def _flush_stale_log_queue(self):
+        """書き込みタスクが動いていないキューの残りを同期的に書き出し"""
+        if self._log_queue is None or self._log_queue.empty():
+            return
+        
+        entries = []
+        while not self._log_queue.empty():
+            entries.append(self._log_queue.get_nowait())
+        try:
+            self._flush_log_batch(entries)
         except Exception as e:
             logger.error(f"通知ログ記録エラー: {e}")
     
+    async def _log_writer(self):
+        """通知ログ書き込みタスク（溜まった分をまとめて1回で追記）"""
+        queue = self._log_queue
+        loop = asyncio.get_running_loop()
+        while True:
+            entries = [await queue.get()]
+            while len(entries) < LOG_FLUSH_MAX_ENTRIES and not queue.empty():
+                entries.append(queue.get_nowait())
+            
+            try:
+                await loop.run_in_executor(None, self._flush_log_batch, entries)
+            except Exception as e:
+                logger.error(f"通知ログ記録エラー: {e}")
+            finally:
+                for _ in entries:
+                    queue.task_done()
+    
+    def _flush_log_batch(self, entries: List[Dict]):
+        """通知ログをまとめて追記"""
+        with open(self.notification_log_file, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+    
     def create_text_message(self, text: str) -> Dict:
         """テキストメッセージ作成"""
         # 長さ制限チェック
@@ -246,14 +395,7 @@ class LINENotificationSystem:
             weather = forecast_result.get("weather_conditions", {})
             
             # 色設定
-            risk_colors = {
-                "Low": "#00FF00",
-                "Medium": "#FFFF00", 
-                "High": "#FF8000",
-                "Critical": "#FF0000",
-                "Unknown": "#808080"
-            }
-            color = risk_colors.get(risk_level, "#808080")
+            color = self._risk_colors.get(risk_level, "#808080")
             
             # アイコン
             icon = self.emoji_map.get(risk_level, "❓")
@@ -289,7 +431,7 @@ class LINENotificationSystem:
                                 "contents": [
                                     {
                                         "type": "text",
-                                        "text": f"{self.emoji_map['ferry']} 航路",
+                                        "text": self._labels["route"],
                                         "flex": 0,
                                         "size": "sm",
                                         "color": "#666666"
@@ -311,7 +453,7 @@ class LINENotificationSystem:
                                 "contents": [
                                     {
                                         "type": "text",
-                                        "text": f"{self.emoji_map['time']} 出発",
+                                        "text": self._labels["departure"],
                                         "flex": 0,
                                         "size": "sm",
                                         "color": "#666666"
@@ -333,7 +475,7 @@ class LINENotificationSystem:
                                 "contents": [
                                     {
                                         "type": "text",
-                                        "text": f"{self.emoji_map['alert']} リスク",
+                                        "text": self._labels["risk"],
                                         "flex": 0,
                                         "size": "sm",
                                         "color": "#666666"
@@ -357,7 +499,7 @@ class LINENotificationSystem:
                             # 気象条件
                             {
                                 "type": "text",
-                                "text": f"{self.emoji_map['weather']} 気象条件",
+                                "text": self._labels["weather"],
                                 "weight": "bold",
                                 "size": "sm",
                                 "margin": "md"
@@ -376,7 +518,7 @@ class LINENotificationSystem:
                         "contents": [
                             {
                                 "type": "text",
-                                "text": f"{self.emoji_map['wind']} 風速",
+                                "text": self._labels["wind"],
                                 "flex": 0,
                                 "size": "xs",
                                 "color": "#666666"
@@ -396,7 +538,7 @@ class LINENotificationSystem:
                         "contents": [
                             {
                                 "type": "text",
-                                "text": f"{self.emoji_map['wave']} 波高",
+                                "text": self._labels["wave"],
                                 "flex": 0,
                                 "size": "xs",
                                 "color": "#666666"
@@ -416,7 +558,7 @@ class LINENotificationSystem:
                         "contents": [
                             {
                                 "type": "text",
-                                "text": f"{self.emoji_map['visibility']} 視界",
+                                "text": self._labels["visibility"],
                                 "flex": 0,
                                 "size": "xs",
                                 "color": "#666666"
@@ -436,7 +578,7 @@ class LINENotificationSystem:
                         "contents": [
                             {
                                 "type": "text",
-                                "text": f"{self.emoji_map['temperature']} 気温",
+                                "text": self._labels["temperature"],
                                 "flex": 0,
                                 "size": "xs",
                                 "color": "#666666"
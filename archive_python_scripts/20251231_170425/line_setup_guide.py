@@ -314,6 +314,8 @@ async def send_test_notification(line_system: LINENotificationSystem):
             
     except Exception as e:
         print(f"❌ テスト送信エラー: {e}")
+    finally:
+        await line_system.aclose()
 
 def generate_friend_qr_code(line_system: LINENotificationSystem):
     """友だち追加QRコード生成"""
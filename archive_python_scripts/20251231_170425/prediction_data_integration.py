@@ -279,7 +279,51 @@ class PredictionDataIntegration:
         except Exception as e:
             logger.error(f"ML予測でエラー: {e}")
             return {"error": str(e)}
-    
+
+    def predict_with_ml_model_batch(self, weather_df: pd.DataFrame, route_ids: List[str],
+                                    departure_times: List[str]) -> Optional[np.ndarray]:
+        """機械学習モデルによる一括予測（欠航確率の配列を返す）"""
+        try:
+            if self.ml_model is None:
+                self.load_trained_model()
+                if self.ml_model is None:
+                    return None
+
+            if weather_df.empty:
+                return np.empty(0)
+
+            # 特徴量行列を列単位で構築
+            n = len(weather_df)
+            departure_hours = pd.to_datetime(
+                pd.Series(departure_times), format='%H:%M', errors='coerce'
+            ).dt.hour.fillna(12).to_numpy()
+            route_ids_encoded = np.fromiter(
+                (self._encode_route_name_to_id(route_id) for route_id in route_ids),
+                dtype=float, count=n
+            )
+
+            def column(name: str, default: float) -> np.ndarray:
+                if name not in weather_df:
+                    return np.full(n, default, dtype=float)
+                return weather_df[name].fillna(default).to_numpy(dtype=float)
+
+            features = np.column_stack([
+                np.full(n, datetime.now().month, dtype=float),
+                departure_hours,
+                column("wind_speed", 0),
+                column("wave_height", 0),
+                column("visibility", 10),
+                column("temperature", 5),
+                route_ids_encoded
+            ])
+
+            # 予測実行（1回のpredict_probaで全便分）
+            return self.ml_model.predict_proba(features)[:, 1]
+
+        except Exception as e:
+            logger.error(f"ML一括予測でエラー: {e}")
+            return None
+
     def _encode_route_name_to_id(self, route_name: str) -> int:
         """航路名からIDへ変換"""
         route_mapping = {
@@ -29,7 +29,10 @@ class IntegratedPredictionRunner:
         
         # 1. 現在の運航状況監視
         print("1. 現在の運航状況を確認中...")
-        status_info = await self.monitoring_system.check_ferry_status()
+        try:
+            status_info = await self.monitoring_system.check_ferry_status()
+        finally:
+            await self.monitoring_system.aclose()
         print(f"運航状況: {status_info}")
         
         # 2. 蓄積データによる学習更新
@@ -191,7 +194,7 @@ def main():
         elif choice == "2":
             # 監視システムのみ
             print("監視システムを開始します...")
-            asyncio.run(runner.monitoring_system.monitor_all_routes())
+            asyncio.run(runner.monitoring_system.run_once())
             
         elif choice == "3":
             # 学習システムのみ
@@ -13,7 +13,6 @@ def install_requirements():
     """必要なパッケージをインストール"""
     additional_packages = [
         'beautifulsoup4>=4.9.0',
-        'schedule>=1.1.0',
         'lxml>=4.6.0'
     ]
     
@@ -7,7 +7,6 @@ Hokkaido Ferry Prediction System Integration Demo
 全システムの連携動作を確認するデモンストレーション
 """
 
-import asyncio
 import json
 from datetime import datetime
 from pathlib import Path
@@ -173,7 +172,7 @@ def demo_all_features(ui_system: FerryForecastUI):
         print(f"   📅 {datetime.now().strftime('%Y年%m月%d日')} の予報例:")
         
         for service in today_services:
-            forecast = asyncio.run(ui_system.generate_forecast_for_service(service))
+            forecast = ui_system.generate_forecast_for_service(service)
             risk_icons = {"Low": "🟢", "Medium": "🟡", "High": "🟠", "Critical": "🔴"}
             icon = risk_icons.get(forecast.risk_level, "❓")
             
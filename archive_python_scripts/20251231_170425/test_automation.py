@@ -43,7 +43,7 @@ class AutomationTester:
         logger.info(f"Python Version: {python_version}")
         
         # Required packages check
-        required_packages = ['pandas', 'requests', 'schedule', 'beautifulsoup4']
+        required_packages = ['pandas', 'requests', 'beautifulsoup4']
         missing_packages = []
         
         for package in required_packages:
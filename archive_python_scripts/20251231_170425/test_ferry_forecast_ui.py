@@ -0,0 +1,103 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+import ferry_forecast_ui
+from ferry_forecast_ui import FerryForecastUI
+from prediction_data_integration import PredictionDataIntegration
+from threshold_grid import around, grid
+
+
+# Baseline thresholds of AdaptivePredictionSystem (medium: 15 m/s, 3.0 m, 2.0 km, -5 °C)
+ADAPTED_THRESHOLDS = {
+    "wind_speed": {"low": 10.0, "medium": 15.0, "high": 20.0, "critical": 25.0},
+    "wave_height": {"low": 2.0, "medium": 3.0, "high": 4.0, "critical": 5.0},
+    "visibility": {"critical": 0.5, "high": 1.0, "medium": 2.0, "low": 5.0},
+    "temperature": {"critical": -15.0, "high": -10.0, "medium": -5.0, "low": 0.0},
+}
+
+# Rule clamps and the primary-factor cut-offs (critical x0.8 / x1.5), with the ends of each range
+WEATHER_GRID = grid(
+    wind_speed=[0.0, *around(15.0 * 0.8, 15.0), 40.0],
+    wave_height=[0.0, *around(3.0 * 0.8, 3.0), 6.0],
+    visibility=[0.0, *around(1.0 * 1.5, 2.0), 20.0],
+    temperature=[-20.0, *around(-10.0, -5.0, 0.0), 20.0],
+)
+
+
+def _make_ui():
+    """FerryForecastUI with its subsystems replaced, so no data files are read or written"""
+    with mock.patch.object(ferry_forecast_ui, "FerryPredictionEngine"), \
+            mock.patch.object(ferry_forecast_ui, "PredictionDataIntegration"), \
+            mock.patch.object(ferry_forecast_ui, "DataCollectionManager"), \
+            mock.patch.object(ferry_forecast_ui, "AdaptivePredictionSystem"):
+        ui = FerryForecastUI()
+    ui.adaptive_system.current_config = {"adapted_thresholds": ADAPTED_THRESHOLDS}
+    return ui
+
+
+def _trained_integration(seed):
+    """PredictionDataIntegration with a small seeded model, without touching data files"""
+    rng = np.random.default_rng(seed)
+    features = np.column_stack([
+        rng.integers(1, 13, 400),
+        rng.integers(6, 19, 400),
+        rng.uniform(0, 30, 400),
+        rng.uniform(0, 6, 400),
+        rng.uniform(0, 20, 400),
+        rng.uniform(-15, 25, 400),
+        rng.integers(0, 4, 400),
+    ])
+    labels = (features[:, 2] * 0.1 + features[:, 3] * 0.5 + rng.normal(0, 1, 400) > 3).astype(int)
+
+    integration = PredictionDataIntegration.__new__(PredictionDataIntegration)
+    integration.ml_model = RandomForestClassifier(n_estimators=10, max_depth=5, random_state=seed)
+    integration.ml_model.fit(features, labels)
+    return integration
+
+
+class FerryForecastBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.ui = _make_ui()
+
+    def test_blend_matches_per_service_hybrid_path(self):
+        self.ui.data_integration = _trained_integration(20251231)
+        services = self.ui.generate_7day_schedule()
+        weather_list = WEATHER_GRID[::37]
+        services = [services[i % len(services)] for i in range(len(weather_list))]
+        params = {"data_count": 120}
+
+        blended = self.ui._blend_ml_and_rule_risks(services, pd.DataFrame(weather_list), params["data_count"])
+
+        expected = [
+            self.ui.generate_forecast_for_service(service, weather, prediction_params=params).risk_score
+            for service, weather in zip(services, weather_list)
+        ]
+        np.testing.assert_allclose(blended, expected, rtol=0, atol=1e-9)
+
+    def test_rule_risks_match_scalar_rules(self):
+        weather_list = WEATHER_GRID + [{"wind_speed": 15.0}, {"temperature": -12.0}]
+
+        risks = self.ui._apply_initial_rules_batch(pd.DataFrame(weather_list))
+
+        expected = [self.ui._apply_initial_rules(weather)[0] for weather in weather_list]
+        np.testing.assert_allclose(risks, expected, rtol=0, atol=1e-9)
+
+    def test_primary_factors_match_scalar_factors(self):
+        # February has the low-temperature and drift-ice rules, November only the former, June neither
+        points = [(weather, month) for month in (2, 11, 6) for weather in WEATHER_GRID[::3]]
+        weather_list, months = zip(*points)
+
+        factors_list = self.ui._identify_primary_factors_batch(pd.DataFrame(list(weather_list)), np.array(months))
+
+        self.assertEqual(
+            factors_list,
+            [self.ui._identify_primary_factors(weather, month) for weather, month in points]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
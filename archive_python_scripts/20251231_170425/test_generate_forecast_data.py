@@ -0,0 +1,50 @@
+import json
+import unittest
+
+from generate_forecast_data import ForecastDataGenerator
+from threshold_grid import around, columns, sample
+
+
+# The generator's routes plus the summer Kutsugata-Kafuka pair, which only matches the Kafuka rule
+ROUTES = [
+    "wakkanai_oshidomari_outbound",
+    "oshidomari_wakkanai_inbound",
+    "wakkanai_kafuka_outbound",
+    "kafuka_wakkanai_inbound",
+    "oshidomari_kafuka",
+    "kafuka_oshidomari",
+    "kutsugata_kafuka",
+    "kafuka_kutsugata",
+]
+
+POINTS = sample(
+    4000, 1211,
+    wind_speed=[0.0, *around(15.0, 18.0, 22.0), 35.0],
+    wave_height=[0.0, *around(2.5, 3.0, 4.0), 7.0],
+    visibility=[0.0, *around(1.0, 2.0), 20.0],
+    temperature=[-20.0, *around(-10.0, -5.0), 15.0],
+    route=ROUTES,
+    days_ahead=list(range(7)),
+)
+
+
+class CancellationRisksBatchTest(unittest.TestCase):
+    def test_batch_matches_scalar_risks(self):
+        # The scoring methods only use class attributes; skip __init__ so no data directory is created
+        generator = ForecastDataGenerator.__new__(ForecastDataGenerator)
+        arrays = columns(POINTS)
+        weather = {key: arrays[key] for key in ("wind_speed", "wave_height", "visibility", "temperature")}
+
+        risk_infos = generator.calculate_cancellation_risks(weather, arrays["route"], arrays["days_ahead"])
+
+        expected = [
+            generator.calculate_cancellation_risk(point, point["route"], point["days_ahead"])
+            for point in POINTS
+        ]
+        self.assertEqual(risk_infos, expected)
+        # Ints must stay ints so the exported JSON is unchanged (35, not 35.0)
+        self.assertEqual(json.dumps(risk_infos), json.dumps(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from initial_flight_prediction_model import (
+    FlightPredictionBatch,
+    FlightPredictionInput,
+    InitialFlightPredictor,
+)
+from threshold_grid import around, columns, sample
+
+
+# Fog/front/Karman thresholds with their neighbouring floats; months cover every seasonal branch
+POINTS = sample(
+    3000, 1103,
+    month=[5, 7, 9, 10],
+    hour=[6, 12],
+    temperature=[18.0],
+    humidity=[50.0, *around(90.0)],
+    wind_speed=[0.0, *around(8.0, 10.0, 15.0, 20.0, 25.0), 40.0],
+    wind_direction=[0, 269, 270, 330, 331],
+    visibility=[0.0, *around(1600.0, 5000.0), 10000.0],
+    pressure=[*around(1010.0)],
+    precipitation=[0.0, *around(1.0)],
+    sea_temperature_diff=[0.0, *around(3.0)],
+) + [
+    # No rule fires: all three risks tie at 0.0 and the scalar sort keeps "Sea Fog"
+    dict(month=5, hour=12, temperature=12.0, humidity=50.0, wind_speed=9.0, wind_direction=90,
+         visibility=10000.0, pressure=1020.0, precipitation=0.0, sea_temperature_diff=0.0),
+]
+
+
+def _input(point):
+    fields = {key: value for key, value in point.items() if key not in ("month", "hour")}
+    return FlightPredictionInput(
+        flight_date=datetime(2025, point["month"], 1),
+        flight_time=f"{point['hour']:02d}:00",
+        route="RIS-OKD",
+        mountain_wave_risk="medium",
+        **fields,
+    )
+
+
+class FlightPredictionBatchTest(unittest.TestCase):
+    def test_batch_matches_scalar_prediction(self):
+        predictor = InitialFlightPredictor()
+        batch = FlightPredictionBatch(**columns(POINTS), mountain_wave_risk="medium")
+
+        probability, primary_factor = predictor.calculate_overall_prediction_batch(batch)
+
+        expected = [predictor.calculate_overall_prediction(_input(point)) for point in POINTS]
+        np.testing.assert_allclose(
+            probability, [e.cancellation_probability for e in expected], rtol=0, atol=1e-12
+        )
+        self.assertEqual(primary_factor.tolist(), [e.primary_risk_factor for e in expected])
+
+    def test_broadcast_batch_matches_explicit_batch(self):
+        predictor = InitialFlightPredictor()
+        hours = np.array([8, 14, 16, 9, 15])
+        weather = dict(temperature=18.0, humidity=92.0, wind_speed=8.0, wind_direction=280,
+                       visibility=1500.0, pressure=1008.0, precipitation=1.0, sea_temperature_diff=6.0)
+
+        broadcast = FlightPredictionBatch.from_weather_broadcast(7, hours, *weather.values(), "medium")
+        explicit = FlightPredictionBatch(
+            **columns([dict(month=7, hour=hour, **weather) for hour in hours.tolist()]),
+            mountain_wave_risk="medium",
+        )
+
+        for actual, expected in zip(predictor.calculate_overall_prediction_batch(broadcast),
+                                    predictor.calculate_overall_prediction_batch(explicit)):
+            np.testing.assert_array_equal(actual, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from initialize_ferry_data import FerryDataInitializer
+from threshold_grid import around, columns, grid
+
+
+def _reference_status(weather_condition, wind_speed, wave_height, u):
+    """Original per-departure rule, with random.random() replaced by the draw u"""
+    if weather_condition == "Strong Wind" or wind_speed > 25 or wave_height > 3.0:
+        return ("Cancelled", 1, 0) if u < 0.8 else ("Delayed", 0, 1)
+    elif weather_condition in ["Rain", "Snow"] or wind_speed > 15 or wave_height > 2.0:
+        cancel, delay = 0.2, 0.5
+    elif weather_condition == "Fog":
+        cancel, delay = 0.1, 0.3
+    else:
+        cancel, delay = 0.02, 0.08
+
+    if u < cancel:
+        return "Cancelled", 1, 0
+    elif u < delay:
+        return "Delayed", 0, 1
+    else:
+        return "On Schedule", 0, 0
+
+
+# Every condition against the wind/wave thresholds of the status rules
+POINTS = grid(
+    cond=list(range(len(FerryDataInitializer.WEATHER_CONDITIONS))),
+    wind_speed=[0.0, *around(15.0, 25.0), 35.0],
+    wave_height=[0.0, *around(2.0, 3.0), 4.0],
+)
+
+
+class DetermineStatusTest(unittest.TestCase):
+    SEED = 136
+
+    def test_matches_reference_rule(self):
+        departures = len(FerryDataInitializer.DEPARTURE_SLOTS)
+        arrays = columns(POINTS)
+
+        status_idx = FerryDataInitializer(seed=self.SEED).determine_status(
+            arrays["cond"], arrays["wind_speed"], arrays["wave_height"], departures
+        )
+
+        # determine_status takes exactly one draw per departure from the instance RNG
+        draws = np.random.default_rng(self.SEED).random((len(POINTS), departures))
+        expected = [
+            [
+                _reference_status(FerryDataInitializer.WEATHER_CONDITIONS[point["cond"]],
+                                  point["wind_speed"], point["wave_height"], u)
+                for u in day_draws
+            ]
+            for point, day_draws in zip(POINTS, draws.tolist())
+        ]
+        outcomes = FerryDataInitializer.STATUS_OUTCOMES
+        self.assertEqual([[outcomes[i] for i in row] for row in status_idx.tolist()], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+import numpy as np
+
+from initialize_ferry_data import FerryDataInitializer
+from threshold_grid import around
+from utils_numba import _sample_status, _sample_status_njit, _sample_status_numpy, sample_status
+
+
+THRESHOLDS = np.array(FerryDataInitializer.STATUS_THRESHOLDS)
+
+
+class SampleStatusTest(unittest.TestCase):
+    def test_kernels_match_reference_loop(self):
+        # One day per risk category, each departing once per draw at and around every cumulative threshold
+        draws = np.array([0.0, *(value for value in around(*THRESHOLDS.ravel().tolist()) if 0.0 <= value < 1.0)])
+        draws = np.tile(draws, (len(THRESHOLDS), 1))
+        category = np.arange(len(THRESHOLDS))
+
+        expected = _sample_status(category, draws, THRESHOLDS)
+
+        kernels = [sample_status, _sample_status_numpy]
+        if _sample_status_njit is not None:
+            kernels.append(_sample_status_njit)
+        for kernel in kernels:
+            np.testing.assert_array_equal(kernel(category, draws, THRESHOLDS), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
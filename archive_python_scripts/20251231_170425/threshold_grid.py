@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Threshold grids shared by the batch-vs-scalar equivalence tests
+"""
+
+import itertools
+import random
+
+import numpy as np
+
+
+def around(*thresholds):
+    """Each threshold together with the nearest float on either side, sorted"""
+    values = set()
+    for threshold in thresholds:
+        values.update((np.nextafter(threshold, -np.inf), threshold, np.nextafter(threshold, np.inf)))
+    return sorted(float(value) for value in values)
+
+
+def grid(**axes):
+    """Cartesian product of the axes, one dict per point"""
+    names = list(axes)
+    return [dict(zip(names, point)) for point in itertools.product(*axes.values())]
+
+
+def sample(count, seed, **axes):
+    """count points drawn from the axes with a seeded RNG, for axes too many to take the product"""
+    rng = random.Random(seed)
+    return [{name: rng.choice(values) for name, values in axes.items()} for _ in range(count)]
+
+
+def columns(points):
+    """Grid points as one array per axis"""
+    return {name: np.array([point[name] for point in points]) for name in points[0]}